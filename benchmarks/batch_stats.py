@@ -0,0 +1,54 @@
+"""スカラー版 calculate_stats と PokemonBatch の速度比較 (結果の一致も確認する)
+
+    python -m benchmarks.batch_stats [個体数]
+"""
+import random
+import sys
+import time
+from pokemon.batch import PokemonBatch
+from pokemon.config import Config
+from pokemon.pokemon import Pokemon
+from pokemon.stats import STAT_KEYS
+
+
+def make_roster(count, rng):
+    roster = []
+    names = list(Config.POKEMON_DATA)
+    for _ in range(count):
+        pokemon = Pokemon.create_pokemon(rng.choice(names), 1)
+        pokemon.level = rng.randint(1, 100)
+        pokemon.ivs = {stat: rng.randint(0, 31) for stat in STAT_KEYS}
+        pokemon.evs = {stat: rng.randint(0, 252) for stat in STAT_KEYS}
+        roster.append(pokemon)
+    return roster
+
+
+def main(count=100000):
+    roster = make_roster(count, random.Random(0))
+
+    start = time.perf_counter()
+    for pokemon in roster:
+        pokemon.calculate_stats()
+    scalar = time.perf_counter() - start
+    expected = [list(pokemon._stats) for pokemon in roster]
+
+    batch = PokemonBatch.from_pokemon(roster)
+    start = time.perf_counter()
+    stats = batch.calculate_stats()
+    vectorized = time.perf_counter() - start
+
+    if stats.tolist() != expected:
+        raise AssertionError("PokemonBatch の計算結果がスカラー版と一致しません。")
+    # 書き戻した結果は計算済みとして扱われ、calculate_stats で計算し直されない
+    for pokemon in roster:
+        pokemon.calculate_stats()
+    batch.apply_to(roster)
+    if any(pokemon._stats_dirty for pokemon in roster):
+        raise AssertionError("apply_to で書き戻したステータスが計算済みになっていません。")
+    print(f"個体数      : {count}")
+    print(f"スカラー    : {scalar:.3f} 秒")
+    print(f"PokemonBatch: {vectorized:.3f} 秒 ({scalar / vectorized:.0f} 倍)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,63 @@
+"""ダメージ計算のスカラー版と NumPy 版の速度比較 (結果の一致は tests/test_damage.py で確かめる)
+
+    python -m benchmarks.damage [組み合わせ数]
+"""
+import random
+import sys
+import tempfile
+import time
+from benchmarks.synthetic import write_dataset
+from pokemon.config import Config
+from pokemon.damage import MAX_ROLL, MIN_ROLL, DamageCalculator, DamageTable
+from pokemon.pokemon import Pokemon
+
+
+def main(count=200000):
+    with tempfile.TemporaryDirectory() as data_dir:
+        names = write_dataset(data_dir)
+        Config.DATA_DIR = data_dir
+        rng = random.Random(0)
+        roster = Pokemon.create_many([(rng.choice(names), rng.randint(1, 100)) for _ in range(2000)], seed=0)
+        calculator = DamageCalculator()
+
+        attackers = [rng.choice(roster) for _ in range(count)]
+        defenders = [rng.choice(roster) for _ in range(count)]
+        moves = [rng.choice(attacker.moves).spec for attacker in attackers]
+        rolls = [rng.randint(MIN_ROLL, MAX_ROLL) for _ in range(count)]
+
+        # NumPy の読み込みは計測に含めない
+        calculator.damage_many(attackers[:1], defenders[:1], moves[:1])
+
+        start = time.perf_counter()
+        [calculator.damage(a, d, m, r) for a, d, m, r in zip(attackers, defenders, moves, rolls)]
+        scalar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        calculator.damage_many(attackers, defenders, moves, rolls)
+        from_objects = time.perf_counter() - start
+
+        # あらかじめ配列化した表を番号で引く場合
+        specs = sorted({move.spec for pokemon in roster for move in pokemon.moves}, key=lambda spec: spec.name)
+        table = DamageTable(roster, specs)
+        pokemon_ids = {id(pokemon): i for i, pokemon in enumerate(roster)}
+        move_ids = {spec: i for i, spec in enumerate(specs)}
+        indices = ([pokemon_ids[id(a)] for a in attackers], [pokemon_ids[id(d)] for d in defenders],
+                   [move_ids[m] for m in moves])
+        start = time.perf_counter()
+        table.damage(*indices, rolls)
+        from_table = time.perf_counter() - start
+
+        # 表を使い回して、個体・わざのオブジェクトのまま計算する場合
+        start = time.perf_counter()
+        calculator.damage_many(attackers, defenders, moves, rolls, table=table)
+        from_reused = time.perf_counter() - start
+
+    print(f"組み合わせ数        : {count}")
+    print(f"スカラー            : {count / scalar:12,.0f} 回/秒")
+    print(f"damage_many         : {count / from_objects:12,.0f} 回/秒 ({scalar / from_objects:.1f} 倍)")
+    print(f"damage_many (表)    : {count / from_reused:12,.0f} 回/秒 ({scalar / from_reused:.1f} 倍)")
+    print(f"DamageTable (番号)  : {count / from_table:12,.0f} 回/秒 ({scalar / from_table:.1f} 倍)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,47 @@
+"""pokemon パッケージの import 時間と、性格データだけを使う場合の起動時間を
+遅延読み込み / 即時読み込み (POKEMON_EAGER_LOAD) で比較する
+
+    python -m benchmarks.import_time [種族数] [わざ数]
+"""
+import sys
+import tempfile
+from benchmarks.startup import time_script
+from benchmarks.synthetic import write_dataset
+
+IMPORT_ONLY = """
+import time
+start = time.perf_counter()
+import pokemon.pokemon
+print(time.perf_counter() - start)
+"""
+NATURES_ONLY = """
+import time
+start = time.perf_counter()
+from pokemon.config import Config
+Config.NATURES[0]
+print(time.perf_counter() - start)
+"""
+FIRST_POKEMON = """
+import time
+start = time.perf_counter()
+from pokemon.pokemon import Pokemon
+Pokemon.create_pokemon({name!r}, 50)
+print(time.perf_counter() - start)
+"""
+
+
+def main(species=1000, moves=900):
+    with tempfile.TemporaryDirectory() as data_dir:
+        name = write_dataset(data_dir, species, moves)[0]
+        time_script(IMPORT_ONLY, data_dir, POKEMON_EAGER_LOAD='1')  # キャッシュを作成
+        print(f"データ規模: {species} 種族 / {moves} わざ")
+        print(f"{'':22}{'遅延':>10}{'即時':>10}")
+        for label, script in (('import のみ', IMPORT_ONLY), ('性格データのみ', NATURES_ONLY),
+                              ('最初の create_pokemon', FIRST_POKEMON.format(name=name))):
+            lazy = time_script(script, data_dir)
+            eager = time_script(script, data_dir, POKEMON_EAGER_LOAD='1')
+            print(f"{label:22}{lazy * 1000:8.1f}ms{eager * 1000:8.1f}ms")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,61 @@
+"""「レベル L までにわざ X を覚える種族」の検索を、全種族の走査と LearnsetIndex で比べる。
+両者の結果が一致することも確認する
+
+    python -m benchmarks.learnset_index [検索回数]
+"""
+import random
+import sys
+import tempfile
+import time
+from benchmarks.synthetic import write_dataset
+from pokemon.config import Config
+from pokemon.learnset import LearnsetIndex
+
+
+def scan(move, level):
+    # 索引を使わない場合の検索 (種族ごとに level_up_moves をたどる)
+    found = []
+    for name, data in Config.POKEMON_DATA.items():
+        for move_level, moves in data['level_up_moves'].items():
+            if move_level <= level and move in moves:
+                found.append(name)
+                break
+    return sorted(found)
+
+
+def main(queries=2000):
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_dataset(data_dir)
+        Config.DATA_DIR = data_dir
+        Config.initialize()
+        rng = random.Random(0)
+        move_names = list(Config.MOVES_DATA)
+        searches = [(rng.choice(move_names), rng.randint(1, 100)) for _ in range(queries)]
+
+        start = time.perf_counter()
+        index = LearnsetIndex.default()
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = [scan(move, level) for move, level in searches]
+        scan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = [sorted(index.species_learning(move, level)) for move, level in searches]
+        index_time = time.perf_counter() - start
+        if actual != expected:
+            raise AssertionError("LearnsetIndex の検索結果が全種族の走査と一致しません。")
+        names = rng.sample(list(Config.POKEMON_DATA), 50)
+        for (move, level), learners in zip(searches[:200], expected):
+            for name in names:
+                if index.can_learn(name, move, level) != (name in learners):
+                    raise AssertionError(f"{name} / {move}: can_learn の結果が一致しません。")
+
+    print(f"{len(Config.POKEMON_DATA)} 種族, 検索 {queries} 回")
+    print(f"索引の作成   : {build_time * 1e3:8.1f} ms")
+    print(f"全種族の走査 : {scan_time / queries * 1e6:8.1f} µs/回")
+    print(f"索引         : {index_time / queries * 1e6:8.1f} µs/回 ({scan_time / index_time:.0f} 倍)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,67 @@
+"""1体あたりのメモリ使用量を、旧来の dict ベースの表現と比較する
+
+    python -m benchmarks.memory [個体数]
+"""
+import random
+import sys
+import tracemalloc
+from pokemon.config import Config
+from pokemon.move import Move
+from pokemon.nature import Nature
+from pokemon.pokemon import Pokemon
+from pokemon.stats import STAT_CACHE
+
+
+class DictPokemon:
+    """__slots__ / MoveSet 導入前と同じ属性レイアウトを持つ比較用の個体"""
+
+    def __init__(self, name, data, template):
+        self.name = name
+        self.nature = Nature(**random.choice(Config.NATURES))
+        types = data['type']
+        self.types = list(types) if isinstance(types, (list, tuple)) else [types]
+        self.base_stats = data['base_stats']
+        self.stat_names = {
+            'hp': 'HP', 'attack': 'こうげき', 'defense': 'ぼうぎょ',
+            'sp_attack': 'とくこう', 'sp_defense': 'とくぼう', 'speed': 'すばやさ'
+        }
+        self.level = 10
+        self.ivs = {stat: random.randint(0, 31) for stat in self.base_stats}
+        self.evs = {stat: 0 for stat in self.base_stats}
+        self.stats = {stat: 0 for stat in self.base_stats}
+        self.moves = [Move(name=move.name, type=move.type, power=move.power, accuracy=move.accuracy,
+                           pp=move.pp, max_pp=move.max_pp, category=move.category)
+                      for move in template.moves]
+        self.level_up_moves = data['level_up_moves']
+        self.exp_strategy = None
+        self.exp = 0
+
+
+def measure(factory, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    roster = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del roster
+    return (after - before) / count
+
+
+def main(count=10000):
+    random.seed(0)
+    # 全個体で共有するステータスキャッシュは1体あたりの量に含めない
+    STAT_CACHE.maxsize = 0
+    name = 'ピカチュウ'
+    data = Config.POKEMON_DATA[name]
+    template = Pokemon.create_pokemon(name, 10)
+
+    before = measure(lambda: DictPokemon(name, data, template), count)
+    after = measure(lambda: Pokemon.create_pokemon(name, 10), count)
+    print(f"個体数: {count}")
+    print(f"dict ベース : {before:8.1f} bytes/体")
+    print(f"__slots__   : {after:8.1f} bytes/体")
+    print(f"削減率      : {1 - after / before:8.1%}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
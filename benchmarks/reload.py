@@ -0,0 +1,68 @@
+"""データの再読み込みにかかる時間を合成データで測る。
+変更した種族の生きている個体が、次の calculate_stats で新しい種族値を使うことも確認する
+
+    python -m benchmarks.reload [変更する種族数]
+"""
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import yaml
+from benchmarks.synthetic import write_dataset
+from pokemon.config import Config
+from pokemon.pokemon import Pokemon
+from pokemon.reload import DataReloader
+from pokemon.stats import STAT_KEYS
+
+
+def edit_species(data_dir, names, rng):
+    path = os.path.join(data_dir, 'pokemon_data.yml')
+    with open(path, encoding='utf-8') as file:
+        data = yaml.safe_load(file)
+    for name in names:
+        data[name]['base_stats'] = {stat: rng.randint(20, 160) for stat in STAT_KEYS}
+    with open(path, 'w', encoding='utf-8') as file:
+        yaml.safe_dump(data, file, allow_unicode=True, sort_keys=False)
+    # mtime の分解能が粗いファイルシステムでも変更を検出できるようにする
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    return {name: [data[name]['base_stats'][stat] for stat in STAT_KEYS] for name in names}
+
+
+def main(changes=10):
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    with tempfile.TemporaryDirectory() as data_dir:
+        names = write_dataset(data_dir)
+        Config.DATA_DIR = data_dir
+        rng = random.Random(0)
+        roster = [Pokemon.create_pokemon(name, 50, rng=rng) for name in names]
+        reloader = DataReloader()
+
+        start = time.perf_counter()
+        if reloader.poll():
+            raise AssertionError("何も変更していないのに再読み込みされました。")
+        idle = time.perf_counter() - start
+
+        edited = edit_species(data_dir, rng.sample(names, changes), rng)
+        results = reloader.poll()
+        if len(results) != 1 or sorted(results[0].changed) != sorted(edited):
+            raise AssertionError(f"変更された種族を正しく検出できませんでした: {results}")
+
+        for pokemon in roster:
+            pokemon.calculate_stats()
+            if pokemon.name in edited and list(pokemon._base_stats) != edited[pokemon.name]:
+                raise AssertionError(f"{pokemon.name}: 新しい種族値が反映されていません。")
+        fresh = [Pokemon.create_pokemon(name, 50, rng=rng) for name in edited]
+        for pokemon in fresh:
+            if list(pokemon._base_stats) != edited[pokemon.name]:
+                raise AssertionError(f"{pokemon.name}: 新しく作った個体に新しい種族値が使われていません。")
+
+    print(f"{len(names)} 種族のうち {changes} 種族を変更")
+    print(f"変更なしのポーリング: {idle * 1e3:8.2f} ms")
+    print(f"再読み込み          : {results[0].seconds * 1e3:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,71 @@
+"""ロスターのバイナリ形式と JSON Lines の書き込み・読み込み速度を合成データで比べる。
+読み戻した結果が元のポケモンと一致することも確認する
+
+    python -m benchmarks.roster_io [体数]
+"""
+import io
+import random
+import sys
+import tempfile
+import time
+from benchmarks.synthetic import write_dataset
+from pokemon.config import Config
+from pokemon.pokemon import Pokemon
+from pokemon.serialization import read_jsonl, read_records, read_roster, write_jsonl, write_roster
+
+
+def snapshot(pokemon):
+    return (pokemon.name, pokemon.level, pokemon.exp, pokemon.nature_id, list(pokemon._ivs),
+            list(pokemon._evs), list(pokemon._stats), [(move.name, move.pp) for move in pokemon.moves])
+
+
+def make_roster(names, count, rng):
+    roster = Pokemon.create_many([(rng.choice(names), rng.randint(1, 100)) for _ in range(count)], seed=0)
+    for pokemon in roster:
+        for stat in pokemon.evs:
+            pokemon.evs[stat] = rng.randrange(253)
+        for move in pokemon.moves:
+            move.pp = rng.randrange(move.max_pp + 1)
+        pokemon.calculate_stats()
+    return roster
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main(count=100000):
+    with tempfile.TemporaryDirectory() as data_dir:
+        names = write_dataset(data_dir)
+        Config.DATA_DIR = data_dir
+        roster = make_roster(names, count, random.Random(0))
+        expected = [snapshot(pokemon) for pokemon in roster]
+
+        binary = io.BytesIO()
+        _, write_time = timed(lambda: write_roster(binary, roster))
+        binary.seek(0)
+        _, scan_time = timed(lambda: sum(1 for _ in read_records(binary)))
+        binary.seek(0)
+        restored, read_time = timed(lambda: [snapshot(pokemon) for pokemon in read_roster(binary)])
+        if restored != expected:
+            raise AssertionError("バイナリ形式から読み戻した結果が一致しません。")
+
+        text = io.StringIO()
+        _, jsonl_write_time = timed(lambda: write_jsonl(text, roster))
+        text.seek(0)
+        restored, jsonl_read_time = timed(lambda: [snapshot(pokemon) for pokemon in read_jsonl(text)])
+        if restored != expected:
+            raise AssertionError("JSON Lines から読み戻した結果が一致しません。")
+
+    print(f"ロスター {count} 体")
+    print(f"バイナリ    : {len(binary.getvalue()) / count:6.1f} バイト/体, "
+          f"書き込み {count / write_time:10,.0f} 体/秒, 読み込み {count / read_time:10,.0f} 体/秒 "
+          f"(レコードのみ {count / scan_time:,.0f} 体/秒)")
+    print(f"JSON Lines  : {len(text.getvalue().encode('utf-8')) / count:6.1f} バイト/体, "
+          f"書き込み {count / jsonl_write_time:10,.0f} 体/秒, 読み込み {count / jsonl_read_time:10,.0f} 体/秒")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,139 @@
+"""pokemon.service に負荷をかけ、レイテンシ (p50/p99) と1秒あたりのリクエスト数を測る
+
+    python -m benchmarks.service_load [--requests N] [--connections N] [--window N] [--compare]
+
+合成データを使うサーバーを別プロセスで起動する。--address を指定すると起動済みのサーバーに接続する。
+--compare を付けると、バッチ処理なし (--max-batch 1) のサーバーとも比べる。
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from benchmarks.synthetic import write_dataset
+from pokemon.stats import STAT_KEYS
+
+HANDLES_PER_CONNECTION = 8
+
+
+async def start_server(data_dir, *args):
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, '-m', 'pokemon.service', '--port', '0', *args,
+        stdout=asyncio.subprocess.PIPE, env={**os.environ, 'POKEMON_DATA_DIR': data_dir})
+    line = (await process.stdout.readline()).decode('utf-8').strip()
+    if not line.startswith('待ち受け中: '):
+        process.kill()
+        raise RuntimeError(f"サーバーを起動できませんでした: {line}")
+    return line.split(': ', 1)[1], process
+
+
+async def connect(address):
+    if ':' in address:
+        host, port = address.rsplit(':', 1)
+        return await asyncio.open_connection(host, int(port))
+    return await asyncio.open_unix_connection(address)
+
+
+def make_request(rng, names, handles, natures):
+    roll = rng.random()
+    if roll < 0.4:
+        return {'op': 'stats', 'handle': rng.choice(handles)}
+    if roll < 0.7:
+        return {'op': 'gain_exp', 'handle': rng.choice(handles), 'amount': rng.randint(1, 2000)}
+    if roll < 0.9:
+        return {'op': 'stats', 'name': rng.choice(names), 'level': rng.randint(1, 100),
+                'nature': rng.choice(natures),
+                'ivs': {stat: rng.randint(0, 31) for stat in STAT_KEYS},
+                'evs': {stat: rng.randrange(0, 253, 4) for stat in STAT_KEYS}}
+    return {'op': 'create', 'name': rng.choice(names), 'level': rng.randint(1, 100)}
+
+
+async def run_connection(address, count, window, seed, names, natures, latencies):
+    rng = random.Random(seed)
+    reader, writer = await connect(address)
+
+    async def call(request):
+        writer.write(json.dumps({'id': 0, **request}, ensure_ascii=False).encode('utf-8') + b'\n')
+        return json.loads(await reader.readline())
+
+    handles = []
+    for _ in range(HANDLES_PER_CONNECTION):
+        response = await call({'op': 'create', 'name': rng.choice(names), 'level': 5})
+        handles.append(response['result']['handle'])
+
+    sent = {}
+    slots = asyncio.Semaphore(window)
+    errors = []
+
+    async def receive():
+        for _ in range(count):
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent.pop(response['id']))
+            if not response['ok']:
+                errors.append(response['error'])
+            slots.release()
+
+    receiver = asyncio.create_task(receive())
+    for request_id in range(count):
+        await slots.acquire()
+        request = make_request(rng, names, handles, natures)
+        sent[request_id] = time.perf_counter()
+        writer.write(json.dumps({'id': request_id, **request}, ensure_ascii=False).encode('utf-8') + b'\n')
+        await writer.drain()
+    await receiver
+    writer.close()
+    if errors:
+        raise RuntimeError(f"エラーが返されました: {errors[0]}")
+
+
+async def load(address, requests, connections, window, names, natures):
+    latencies = []
+    per_connection = requests // connections
+    start = time.perf_counter()
+    await asyncio.gather(*(run_connection(address, per_connection, window, i, names, natures, latencies)
+                           for i in range(connections)))
+    elapsed = time.perf_counter() - start
+    quantiles = statistics.quantiles(latencies, n=100)
+    return len(latencies) / elapsed, quantiles[49] * 1e3, quantiles[98] * 1e3
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as data_dir:
+        names = write_dataset(data_dir)
+        from pokemon.nature import NatureTable
+        natures = [nature.name for nature in NatureTable.load()]
+        if args.address:
+            targets = [('', args.address, None)]
+        else:
+            targets = [(f'max-batch={args.max_batch}', *await start_server(data_dir, '--max-batch', str(args.max_batch)))]
+            if args.compare:
+                targets.append(('max-batch=1', *await start_server(data_dir, '--max-batch', '1')))
+
+        print(f"{args.requests} リクエスト, {args.connections} 接続, 接続ごとの同時送信数 {args.window}")
+        for label, address, process in targets:
+            try:
+                rps, p50, p99 = await load(address, args.requests, args.connections, args.window, names, natures)
+            finally:
+                if process is not None:
+                    process.terminate()
+                    await process.wait()
+            print(f"{label:16s} {rps:10,.0f} リクエスト/秒  p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='pokemon.service の負荷テスト')
+    parser.add_argument('--address', help='起動済みサーバーのアドレス (ホスト:ポート または Unix ソケットのパス)')
+    parser.add_argument('--requests', type=int, default=50000)
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--window', type=int, default=32)
+    parser.add_argument('--max-batch', type=int, default=512)
+    parser.add_argument('--compare', action='store_true')
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""create_pokemon(name, 100) の速度を、1レベルずつ上げるループと比べて合成データで測る。
+従来の処理と同じ結果になることは tests/test_set_level.py で確かめる
+
+    python -m benchmarks.set_level [回数]
+"""
+import random
+import sys
+import tempfile
+import time
+from benchmarks.synthetic import write_dataset
+from pokemon.config import Config
+from pokemon.pokemon import Pokemon
+
+
+def legacy_set_level(pokemon, level):
+    """1レベルずつ上げるループ (速度の比較用)"""
+    while pokemon.level < level:
+        pokemon.level += 1
+        for move in pokemon.level_up_moves.get(pokemon.level, ()):
+            pokemon._add_move(move)
+    pokemon.calculate_stats()
+    all_moves = [move for lv, moves in pokemon.level_up_moves.items()
+                 for move in moves if lv <= pokemon.level]
+    pokemon.moves.clear()
+    for move in all_moves[-4:]:
+        pokemon._add_move(move)
+
+
+def main(count=20000):
+    with tempfile.TemporaryDirectory() as data_dir:
+        names = write_dataset(data_dir)
+        Config.DATA_DIR = data_dir
+
+        rng = random.Random(0)
+        targets = [rng.choice(names) for _ in range(count)]
+        start = time.perf_counter()
+        for name in targets:
+            legacy_set_level(Pokemon.create_pokemon(name, 1, rng=rng), 100)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for name in targets:
+            Pokemon.create_pokemon(name, 100, rng=rng)
+        direct = time.perf_counter() - start
+
+    print(f"create_pokemon(name, 100) x {count}")
+    print(f"レベルごとのループ: {legacy / count * 1e6:8.1f} µs/体")
+    print(f"直接設定          : {direct / count * 1e6:8.1f} µs/体 ({legacy / direct:.1f} 倍)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,49 @@
+"""import から最初の create_pokemon までの時間を、データキャッシュの有無で比較する
+
+    python -m benchmarks.startup [種族数] [わざ数]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from benchmarks.synthetic import write_dataset
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+from pokemon.pokemon import Pokemon
+Pokemon.create_pokemon({name!r}, 50)
+print(time.perf_counter() - start)
+"""
+REPEAT = 5
+
+
+def time_script(script, data_dir, **env):
+    """script を別プロセスで実行し、出力された秒数の最小値を返す"""
+    env = dict(os.environ, POKEMON_DATA_DIR=data_dir, **env)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    times = []
+    for _ in range(REPEAT):
+        output = subprocess.run([sys.executable, '-c', script], cwd=root,
+                                env=env, check=True, capture_output=True, text=True).stdout
+        times.append(float(output))
+    return min(times)
+
+
+def run(data_dir, name, **env):
+    return time_script(SCRIPT.format(name=name), data_dir, **env)
+
+
+def main(species=1000, moves=900):
+    with tempfile.TemporaryDirectory() as data_dir:
+        name = write_dataset(data_dir, species, moves)[0]
+        yaml_only = run(data_dir, name, POKEMON_NO_DATA_CACHE='1')
+        run(data_dir, name)  # キャッシュを作成
+        cached = run(data_dir, name)
+    print(f"データ規模    : {species} 種族 / {moves} わざ")
+    print(f"YAML のみ     : {yaml_only * 1000:8.1f} ms")
+    print(f"キャッシュあり: {cached * 1000:8.1f} ms ({yaml_only / cached:.1f} 倍)")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
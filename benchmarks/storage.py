@@ -0,0 +1,57 @@
+"""ボックス検索を Python のリスト走査と SQLite (PokemonStore) で比べる。
+両者の検索結果が一致することも確認する
+
+    python -m benchmarks.storage [体数]
+"""
+import random
+import sys
+import tempfile
+import time
+from benchmarks.synthetic import write_dataset
+from pokemon.config import Config
+from pokemon.pokemon import Pokemon
+from pokemon.storage import PokemonStore
+
+
+def list_query(roster, species, min_level, speed_iv):
+    return [i + 1 for i, pokemon in enumerate(roster)
+            if pokemon.name == species and pokemon.level >= min_level and pokemon.ivs['speed'] >= speed_iv]
+
+
+def main(count=100000, queries=200):
+    with tempfile.TemporaryDirectory() as data_dir:
+        names = write_dataset(data_dir)
+        Config.DATA_DIR = data_dir
+        rng = random.Random(0)
+        roster = Pokemon.create_many([(rng.choice(names), rng.randint(1, 100)) for _ in range(count)], seed=0)
+        searches = [(rng.choice(names), rng.randint(1, 100), rng.randint(0, 31)) for _ in range(queries)]
+
+        with PokemonStore() as store:
+            start = time.perf_counter()
+            store.add_many(roster)
+            insert_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            expected = [list_query(roster, *search) for search in searches]
+            scan_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            actual = [[row.id for row in store.query(species, min_level, min_ivs={'speed': speed_iv})]
+                      for species, min_level, speed_iv in searches]
+            query_time = time.perf_counter() - start
+            if actual != expected:
+                raise AssertionError("SQLite の検索結果がリスト走査と一致しません。")
+
+            for row in store.query(searches[0][0]):
+                pokemon = row.to_pokemon()
+                if list(pokemon._stats) != list(roster[row.id - 1]._stats):
+                    raise AssertionError(f"{pokemon.name}: 復元したステータスが一致しません。")
+
+    print(f"ボックス {count} 体, 検索 {queries} 回")
+    print(f"一括保存     : {count / insert_time:10,.0f} 体/秒")
+    print(f"リスト走査   : {scan_time / queries * 1e3:8.2f} ms/回")
+    print(f"SQLite 検索  : {query_time / queries * 1e3:8.2f} ms/回 ({scan_time / query_time:.1f} 倍)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,225 @@
+"""主要な処理の速度とメモリ使用量を合成データで測り、JSON に書き出す。
+保存しておいたベースラインと比べて、しきい値を超えて遅くなった項目があれば終了コード 1 を返す
+
+    python -m benchmarks.suite [--out 結果.json] [--baseline ベースライン.json] [--threshold 0.2]
+    python -m benchmarks.suite --quick --out benchmarks/baseline.json   # ベースラインを作る
+
+どの項目も小さいほど良い値 (µs/回, ms/回, bytes/体) で記録する。
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+from typing import Callable, Dict, List, Optional
+from benchmarks.memory import measure as measure_memory
+from benchmarks.synthetic import write_dataset
+from pokemon.config import Config
+from pokemon.data_loader import DataLoader
+from pokemon.events import discard_events, keep_moves_policy
+from pokemon.move import MoveSpec
+from pokemon.pokemon import Pokemon
+from pokemon.species import Species
+from pokemon.stats import STAT_CACHE
+
+SEED = 0
+THRESHOLD = 0.2
+
+
+class Suite:
+    def __init__(self, names: List[str], data_dir: str, scale: float = 1.0, repeat: int = 5):
+        self.names = names
+        self.data_dir = data_dir
+        self.scale = scale
+        self.repeat = repeat
+        self.results: Dict[str, Dict[str, float]] = {}
+
+    def count(self, base: int) -> int:
+        return max(1, int(base * self.scale))
+
+    def record(self, name: str, value: float, unit: str) -> None:
+        self.results[name] = {'value': value, 'unit': unit}
+        print(f"{name:32s} {value:12.2f} {unit}", flush=True)
+
+    def time_per_op(self, name: str, setup: Callable[[], Callable[[], object]], number: int) -> None:
+        # 毎回同じ乱数列で準備し直し、repeat 回の最小値を記録する
+        times = []
+        for _ in range(self.repeat):
+            func = setup()
+            times.append(timeit.Timer(func).timeit(number=number) / number)
+        self.record(name, min(times) * 1e6, 'us/op')
+
+    def _targets(self, count: int) -> List[str]:
+        rng = random.Random(SEED)
+        return [rng.choice(self.names) for _ in range(count)]
+
+    def bench_create(self) -> None:
+        for level in (5, 50, 100):
+            number = self.count(2000)
+
+            def setup(level=level, number=number):
+                targets = iter(self._targets(number))
+                rng = random.Random(SEED)
+                return lambda: Pokemon.create_pokemon(next(targets), level, rng=rng)
+
+            self.time_per_op(f"create_pokemon_lv{level}", setup, number)
+
+    def bench_gain_exp(self) -> None:
+        number = self.count(2000)
+        for batched in (False, True):
+            def setup(batched=batched):
+                rng = random.Random(SEED)
+                roster = iter([Pokemon.create_pokemon(name, 1, rng=rng) for name in self._targets(number)])
+                return lambda: next(roster).gain_exp(1_000_000, discard_events, keep_moves_policy, batched=batched)
+
+            self.time_per_op('gain_exp_1m_batched' if batched else 'gain_exp_1m', setup, number)
+
+    def bench_calculate_stats(self) -> None:
+        number = self.count(20000)
+        rng = random.Random(SEED)
+        roster = [Pokemon.create_pokemon(name, rng.randint(1, 100), rng=rng) for name in self._targets(256)]
+
+        def setup(maxsize):
+            STAT_CACHE.clear()
+            STAT_CACHE.maxsize = maxsize
+            pokemon = iter(roster * (number // len(roster) + 1))
+
+            def run():
+                p = next(pokemon)
+                p._stats_dirty = True
+                p.calculate_stats()
+            return run
+
+        maxsize = STAT_CACHE.maxsize
+        try:
+            self.time_per_op('calculate_stats_uncached', lambda: setup(0), number)
+            self.time_per_op('calculate_stats_cached', lambda: setup(maxsize), number)
+        finally:
+            STAT_CACHE.maxsize = maxsize
+            STAT_CACHE.clear()
+
+    def bench_initialize(self) -> None:
+        cache_dir = os.path.join(self.data_dir, DataLoader.CACHE_DIR)
+        use_cache = DataLoader.use_cache
+        DataLoader.use_cache = True
+        # 1回が数十 ms と短く揺れやすいので、キャッシュありの読み込みは何度か続けて呼んだ平均をとる
+        number = self.count(20)
+        cold, warm = [], []
+        try:
+            for _ in range(self.repeat):
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                start = time.perf_counter()
+                Config.initialize()
+                cold.append(time.perf_counter() - start)
+                warm.append(timeit.Timer(Config.initialize).timeit(number=number) / number)
+        finally:
+            DataLoader.use_cache = use_cache
+            Species.clear_cache()
+            MoveSpec.clear_cache()
+        self.record('config_initialize_cold', min(cold) * 1e3, 'ms/op')
+        self.record('config_initialize_warm', min(warm) * 1e3, 'ms/op')
+
+    def bench_memory(self) -> None:
+        count = self.count(10000)
+        maxsize = STAT_CACHE.maxsize
+        # 全個体で共有するステータスキャッシュは1体あたりの量に含めない
+        STAT_CACHE.maxsize = 0
+        # 種族・わざのデータも共有なので、測る前に一度ずつ復元しておく
+        rng = random.Random(SEED)
+        for name in set(self._targets(count)):
+            Pokemon.create_pokemon(name, 100, rng=rng)
+        try:
+            for level in (5, 100):
+                targets = iter(self._targets(count))
+                rng = random.Random(SEED)
+                value = measure_memory(lambda: Pokemon.create_pokemon(next(targets), level, rng=rng), count)
+                self.record(f"memory_per_pokemon_lv{level}", value, 'bytes')
+        finally:
+            STAT_CACHE.maxsize = maxsize
+
+    def run(self) -> Dict[str, Dict[str, float]]:
+        self.bench_create()
+        self.bench_gain_exp()
+        self.bench_calculate_stats()
+        self.bench_initialize()
+        self.bench_memory()
+        return self.results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float = THRESHOLD) -> List[str]:
+    """baseline より threshold の割合を超えて悪化した項目の名前を返す"""
+    regressions = []
+    print(f"\nベースラインとの比較 (しきい値 +{threshold:.0%})")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['value']
+        ratio = result['value'] / before if before else 1.0
+        regressed = ratio > 1 + threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:32s} {before:12.2f} -> {result['value']:12.2f} {result['unit']:6s} "
+              f"({ratio - 1:+7.1%}){'  悪化' if regressed else ''}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='ベンチマークを実行してベースラインと比較する')
+    parser.add_argument('--out', help='結果を書き出す JSON ファイル')
+    parser.add_argument('--baseline', help='比較するベースラインの JSON ファイル')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help='悪化とみなす割合 (0.2 なら 20%%)')
+    parser.add_argument('--species', type=int, default=1000)
+    parser.add_argument('--moves', type=int, default=900)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--quick', action='store_true', help='回数を減らして短時間で実行する')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        names = write_dataset(data_dir, args.species, args.moves, seed=SEED)
+        data_dir_before = Config.DATA_DIR
+        Config.DATA_DIR = data_dir
+        Config.initialize()
+        try:
+            scale = 0.25 if args.quick else 1.0
+            results = Suite(names, data_dir, scale, args.repeat).run()
+        finally:
+            Config.DATA_DIR = data_dir_before
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'species': args.species,
+            'moves': args.moves,
+            'seed': SEED,
+            'quick': args.quick,
+        },
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        for key in ('species', 'moves', 'quick'):
+            if baseline['meta'].get(key) != report['meta'][key]:
+                print(f"注意: ベースラインと {key} の設定が異なります "
+                      f"({baseline['meta'].get(key)} / {report['meta'][key]})")
+        regressions = compare(results, baseline['results'], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} 項目が悪化しました: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
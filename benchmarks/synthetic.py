@@ -0,0 +1,57 @@
+"""ベンチマーク用に規模を大きくした合成データセットを生成する"""
+import os
+import random
+import shutil
+import yaml
+from pokemon.config import Config
+
+TYPES = ['ノーマル', 'ほのお', 'みず', 'でんき', 'くさ', 'こおり', 'かくとう', 'どく', 'じめん',
+         'ひこう', 'エスパー', 'むし', 'いわ', 'ゴースト', 'ドラゴン', 'あく', 'はがね', 'フェアリー']
+CATEGORIES = ['ぶつり', 'とくしゅ', 'へんか']
+EXP_GROWTHS = ['600k', '800k', '1000k', '1050k', '1250k', '1640k']
+STATS = ['hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed']
+
+
+def make_moves(count, rng):
+    moves = {}
+    for i in range(count):
+        category = rng.choice(CATEGORIES)
+        moves[f"わざ{i:04d}"] = {
+            'type': rng.choice(TYPES),
+            'power': 0 if category == 'へんか' else rng.randrange(20, 151, 5),
+            'accuracy': rng.choice([70, 80, 85, 90, 95, 100, 100, 100]),
+            'pp': rng.choice([5, 10, 15, 20, 25, 30, 35, 40]),
+            'category': category,
+        }
+    return moves
+
+
+def make_species(count, move_names, rng):
+    species = {}
+    for i in range(count):
+        levels = sorted(rng.sample(range(2, 101), rng.randint(10, 20)))
+        learnset = {1: rng.sample(move_names, 2)}
+        for level in levels:
+            learnset[level] = [rng.choice(move_names)]
+        types = rng.sample(TYPES, rng.randint(1, 2))
+        species[f"ポケモン{i:04d}"] = {
+            'type': types[0] if len(types) == 1 else types,
+            'base_stats': {stat: rng.randint(20, 160) for stat in STATS},
+            'level_up_moves': learnset,
+            'exp_growth': rng.choice(EXP_GROWTHS),
+        }
+    return species
+
+
+def write_dataset(directory, species=1000, moves=900, seed=0):
+    """directory に pokemon_data.yml / moves_data.yml を書き出し、性格とタイプ相性をコピーする"""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    move_data = make_moves(moves, rng)
+    species_data = make_species(species, list(move_data), rng)
+    for filename, data in (('moves_data.yml', move_data), ('pokemon_data.yml', species_data)):
+        with open(os.path.join(directory, filename), 'w', encoding='utf-8') as file:
+            yaml.safe_dump(data, file, allow_unicode=True, sort_keys=False)
+    for filename in ('natures.yml', 'type_chart.yml'):
+        shutil.copy(os.path.join(Config.DATA_DIR, filename), directory)
+    return sorted(species_data)
@@ -0,0 +1,114 @@
+"""共有の個体群に複数スレッドから操作を加え、スレッド数ごとの処理速度を測る。
+最後に経験値・レベル・わざ・ステータスが矛盾していないことを確認する
+
+    python -m benchmarks.threads [1スレッドあたりの操作回数] [スレッド数...]
+
+GIL のあるビルドでは CPU を使う処理は並列に動かないので、スレッドを増やしても速くならない。
+フリースレッド版の CPython (python3.13t など) で実行すると、コア数に応じた伸びを確認できる。
+"""
+import random
+import sys
+import sysconfig
+import tempfile
+import threading
+import time
+from collections import Counter
+from benchmarks.synthetic import write_dataset
+from pokemon.config import Config
+from pokemon.events import discard_events, replace_oldest_policy
+from pokemon.pokemon import Pokemon
+from pokemon.stats import STAT_KEYS
+
+ROSTER_SIZE = 256
+
+
+def gil_enabled():
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    if is_gil_enabled is not None:
+        return is_gil_enabled()
+    return not sysconfig.get_config_var('Py_GIL_DISABLED')
+
+
+def worker(roster, moves, operations, seed, barrier, grants):
+    rng = random.Random(seed)
+    barrier.wait()
+    for _ in range(operations):
+        index = rng.randrange(len(roster))
+        pokemon = roster[index]
+        op = rng.randrange(4)
+        if op == 0:
+            amount = rng.randint(1, 2000)
+            pokemon.gain_exp(amount, discard_events, replace_oldest_policy)
+            grants[index] += amount
+        elif op == 1:
+            pokemon.set_evs({rng.choice(STAT_KEYS): rng.randint(0, 252)})
+        elif op == 2:
+            pokemon.learn_move(rng.choice(moves), discard_events, replace_oldest_policy)
+        else:
+            pokemon.calculate_stats()
+            sum(pokemon.stats.values())
+
+
+def run(roster, moves, threads, operations):
+    barrier = threading.Barrier(threads + 1)
+    grants = [Counter() for _ in range(threads)]
+    workers = [threading.Thread(target=worker, args=(roster, moves, operations, seed, barrier, grants[seed]))
+               for seed in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(grants, Counter())
+
+
+def check(roster, initial_exp, grants):
+    errors = []
+    for index, pokemon in enumerate(roster):
+        if pokemon.exp != initial_exp[index] + grants[index]:
+            errors.append(f"{pokemon.name}: 経験値 {pokemon.exp} != {initial_exp[index] + grants[index]}")
+        if pokemon.level != pokemon.exp_strategy.level_for_exp(pokemon.exp):
+            errors.append(f"{pokemon.name}: レベル {pokemon.level} が経験値 {pokemon.exp} と合いません")
+        if len(pokemon.moves) > 4:
+            errors.append(f"{pokemon.name}: わざが {len(pokemon.moves)} 個あります")
+        pokemon.calculate_stats()
+        fresh = Pokemon.restore(pokemon.name, pokemon.level, pokemon.exp, pokemon.nature_id,
+                                list(pokemon._ivs), list(pokemon._evs), [])
+        fresh.calculate_stats()
+        if list(pokemon._stats) != list(fresh._stats):
+            errors.append(f"{pokemon.name}: ステータス {list(pokemon._stats)} != {list(fresh._stats)}")
+    return errors
+
+
+def main(operations=20000, thread_counts=(1, 2, 4, 8)):
+    print(f"Python {sys.version.split()[0]} (GIL {'あり' if gil_enabled() else 'なし'})")
+    with tempfile.TemporaryDirectory() as data_dir:
+        names = write_dataset(data_dir)
+        Config.DATA_DIR = data_dir
+        Config.initialize()
+        moves = list(Config.MOVES_DATA)
+        baseline = None
+        failed = False
+        for threads in thread_counts:
+            rng = random.Random(0)
+            roster = [Pokemon.create_pokemon(rng.choice(names), rng.randint(1, 30), rng=rng)
+                      for _ in range(ROSTER_SIZE)]
+            initial_exp = [pokemon.exp for pokemon in roster]
+            elapsed, grants = run(roster, moves, threads, operations)
+            rate = threads * operations / elapsed
+            baseline = baseline or rate
+            errors = check(roster, initial_exp, grants)
+            print(f"{threads:2d} スレッド: {rate:10.0f} 回/秒 ({rate / baseline:4.2f} 倍)"
+                  f"{'' if not errors else f'  不整合 {len(errors)} 件'}")
+            for error in errors[:5]:
+                print(f"    {error}")
+            failed = failed or bool(errors)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    thread_counts = tuple(int(arg) for arg in sys.argv[2:]) or (1, 2, 4, 8)
+    sys.exit(main(operations, thread_counts))
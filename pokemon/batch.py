@@ -0,0 +1,141 @@
+from array import array
+from typing import Optional, Sequence, TYPE_CHECKING, Union
+from .locks import locked_all
+from .nature import NatureTable
+from .species import Species
+from .events import CONSOLE_SINK, EventSink, ExpGained, MovePolicy
+from .stats import HP, STAT_CACHE, STAT_KEYS
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("PokemonBatch を使うには numpy が必要です。")
+
+if TYPE_CHECKING:
+    from .pokemon import Pokemon
+
+
+# N体分の種族値・個体値・努力値・レベル・性格補正を列ごとの配列で保持する
+class PokemonBatch:
+    def __init__(self, base_stats, ivs, evs, levels, nature_multipliers):
+        self.base_stats = np.asarray(base_stats, dtype=np.int64).reshape(-1, len(STAT_KEYS))
+        self.ivs = np.asarray(ivs, dtype=np.int64).reshape(-1, len(STAT_KEYS))
+        self.evs = np.asarray(evs, dtype=np.int64).reshape(-1, len(STAT_KEYS))
+        self.levels = np.asarray(levels, dtype=np.int64).reshape(-1)
+        self.nature_multipliers = np.asarray(nature_multipliers, dtype=np.float64).reshape(-1, len(STAT_KEYS))
+        self.stats = np.zeros_like(self.base_stats)
+        # calculate_stats に使った入力と結果の写し (apply_to で、計算済みの行だけを見分けるのに使う)
+        self._computed = None
+
+        n = len(self.levels)
+        for column in (self.base_stats, self.ivs, self.evs, self.nature_multipliers):
+            if len(column) != n:
+                raise ValueError("PokemonBatch の各配列の長さが一致しません。")
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    @classmethod
+    def from_pokemon(cls, pokemon: Sequence['Pokemon']) -> 'PokemonBatch':
+        # データの再読み込み後なら、先に種族値を最新にしておく
+        for p in pokemon:
+            if p._generation is not None and p._generation != Species.generation:
+                p._sync_species()
+        return cls(
+            base_stats=[p._base_stats for p in pokemon],
+            ivs=[p._ivs for p in pokemon],
+            evs=[p._evs for p in pokemon],
+            levels=[p.level for p in pokemon],
+            nature_multipliers=cls.nature_multipliers([p.nature_id for p in pokemon])
+        )
+
+    @staticmethod
+    def nature_multipliers(nature_ids) -> 'np.ndarray':
+        # 性格番号の配列から (N, 6) の補正配列を作る
+        return NatureTable.as_array()[np.asarray(nature_ids, dtype=np.intp)]
+
+    def calculate_stats(self) -> 'np.ndarray':
+        # Pokemon._calculate_hp / _calculate_other_stat と同じ順序で float64 演算し、
+        # 同じ位置で切り捨てることで結果を完全に一致させる
+        levels = self.levels[:, None]
+        scaled = (2 * self.base_stats + self.ivs + self.evs // 4) * levels / 100
+
+        others = [i for i in range(len(STAT_KEYS)) if i != HP]
+        values = np.trunc(scaled[:, others] + 5)
+        self.stats[:, others] = np.trunc(values * self.nature_multipliers[:, others]).astype(np.int64)
+        self.stats[:, HP] = np.trunc(scaled[:, HP]).astype(np.int64) + self.levels + 10
+        inputs = np.concatenate([self.base_stats, self.ivs, self.evs, self.levels[:, None]], axis=1)
+        self._computed = (inputs, self.nature_multipliers.copy(), self.stats.copy())
+        return self.stats
+
+    def apply_to(self, pokemon: Sequence['Pokemon']) -> None:
+        if len(pokemon) != len(self):
+            raise ValueError("PokemonBatch とポケモンの数が一致しません。")
+        if self._computed is None:
+            self.calculate_stats()
+        inputs, multipliers, computed = self._computed
+        with locked_all(pokemon):
+            # 計算に使った値が個体の今の値と同じで、stats も計算結果のままの行だけを計算済みとして扱い、
+            # STAT_CACHE にも入れる。計算後に書き換えた行は、次の calculate_stats で計算し直される
+            n = len(pokemon)
+            current = np.frombuffer(b''.join([p._base_stats.tobytes() + p._ivs.tobytes() + p._evs.tobytes()
+                                              for p in pokemon]), dtype=np.uint16).reshape(n, 3 * len(STAT_KEYS))
+            levels = np.fromiter((p._level for p in pokemon), dtype=np.int64, count=n)
+            nature_ids = [p._nature_id for p in pokemon]
+            matches = ((current == inputs[:, :-1]).all(axis=1) & (levels == inputs[:, -1])
+                       & (multipliers == type(self).nature_multipliers(nature_ids)).all(axis=1)
+                       & (self.stats == computed).all(axis=1))
+            for p, row, match in zip(pokemon, self.stats.tolist(), matches.tolist()):
+                stats = array('H', row)
+                p._stats = stats
+                if match:
+                    STAT_CACHE.put((p._base_stats.tobytes(), p._level, p._ivs.tobytes(), p._evs.tobytes(),
+                                    p._nature_id), stats.tobytes())
+                p._stats_dirty = not match
+
+def gain_exp_many(pokemon: Sequence['Pokemon'], amounts: Union[int, Sequence[int]],
+                  sink: Optional[EventSink] = None, policy: Optional[MovePolicy] = None) -> None:
+    # 到達レベルの二分探索とステータス計算をまとめて行う Pokemon.gain_exp(batched=True)
+    sink = CONSOLE_SINK if sink is None else sink
+    # 他のスレッドが同じ個体を同時に変更しないよう、全員分のロックを取ってから処理する
+    with locked_all(pokemon):
+        amounts = np.broadcast_to(np.asarray(amounts, dtype=np.int64), (len(pokemon),))
+        pokemon, amounts = _merge_duplicates(pokemon, amounts)
+        n = len(pokemon)
+        exps = np.fromiter((p.exp for p in pokemon), dtype=np.int64, count=n) + amounts
+
+        targets = np.ones(n, dtype=np.int64)
+        groups = {}
+        for i, p in enumerate(pokemon):
+            groups.setdefault(p.exp_strategy, []).append(i)
+        for strategy, indices in groups.items():
+            table = np.asarray(strategy.table, dtype=np.int64)
+            targets[indices] = np.searchsorted(table, exps[indices], side='right') - 1
+        np.maximum(targets, 1, out=targets)
+
+        levels = np.fromiter((p.level for p in pokemon), dtype=np.int64, count=n)
+        leveled = np.flatnonzero(targets > levels)
+        batch = PokemonBatch.from_pokemon([pokemon[i] for i in leveled])
+        batch.levels[:] = targets[leveled]
+        new_stats = dict(zip(leveled.tolist(), batch.calculate_stats().tolist()))
+
+        rows = zip(pokemon, amounts.tolist(), exps.tolist(), targets.tolist())
+        for i, (p, amount, exp, target) in enumerate(rows):
+            p.exp = exp
+            sink(ExpGained(p.name, amount))
+            if i in new_stats:
+                p._jump_to_level(target, sink, policy, new_stats[i])
+
+
+def _merge_duplicates(pokemon: Sequence['Pokemon'], amounts: 'np.ndarray'):
+    # 同じ個体が複数回含まれていたら、経験値を合算して1回分として扱う
+    # (別々に処理すると、どちらも元の経験値から計算するので片方が失われる)
+    positions = {}
+    for p in pokemon:
+        positions.setdefault(id(p), len(positions))
+    if len(positions) == len(pokemon):
+        return pokemon, amounts
+    unique = list({id(p): p for p in pokemon}.values())
+    totals = np.zeros(len(unique), dtype=np.int64)
+    np.add.at(totals, [positions[id(p)] for p in pokemon], amounts)
+    return unique, totals
@@ -1,23 +1,110 @@
 import os
-from .data_loader import DataLoader
+import threading
+from .data_loader import DataLoader, LazyDict, frozen
 
-class Config:
+def _freeze(data):
+    # 共有データを中まで読み取り専用にする (LazyDict は要素を復元するときに読み取り専用にする)
+    if isinstance(data, LazyDict):
+        return data
+    return frozen(data)
+
+# 初めて参照された時点でデータファイルを読み込むクラス属性
+class _LazyData:
+    def __init__(self, filename: str):
+        self.filename = filename
+
+    def __set_name__(self, owner, name):
+        self.attr = f"_{name}"
+
+    def __get__(self, cls, owner=None):
+        value = getattr(cls, self.attr)
+        if value is None:
+            with cls._lock:
+                value = getattr(cls, self.attr)
+                if value is None:
+                    value = _freeze(cls.load_data(self.filename, lazy=cls.LAZY_ENTRIES))
+                    setattr(cls, self.attr, value)
+        return value
+
+    def __set__(self, cls, value):
+        setattr(cls, self.attr, value)
+
+class _ConfigMeta(type):
+    MOVES_DATA = _LazyData('moves_data.yml')
+    POKEMON_DATA = _LazyData('pokemon_data.yml')
+    NATURES = _LazyData('natures.yml')
+    TYPE_CHART = _LazyData('type_chart.yml')
+
+class Config(metaclass=_ConfigMeta):
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    DATA_DIR = os.path.join(BASE_DIR, 'data')
+    DATA_DIR = os.environ.get('POKEMON_DATA_DIR', os.path.join(BASE_DIR, 'data'))
+    # 種族・わざのデータを要素単位で遅延復元するか
+    LAZY_ENTRIES = True
 
     @classmethod
-    def load_data(cls, filename):
-        return DataLoader.load_data(os.path.join(cls.DATA_DIR, filename))
+    def load_data(cls, filename, lazy=False):
+        path = os.path.join(cls.DATA_DIR, filename)
+        return DataLoader.load_lazy(path) if lazy else DataLoader.load_data(path)
 
-    MOVES_DATA = None
-    POKEMON_DATA = None
-    NATURES = None
+    _MOVES_DATA = None
+    _POKEMON_DATA = None
+    _NATURES = None
+    _TYPE_CHART = None
+    _lock = threading.RLock()
+    # use_store で差し替えたデータストアと、ストアから読む属性
+    _store = None
+    STORE_ATTRS = ('POKEMON_DATA', 'MOVES_DATA')
+
+    @classmethod
+    def loaded_data(cls, attr):
+        # 読み込み済みならそのデータを、まだなら読み込まずに None を返す
+        return getattr(cls, f"_{attr}")
+
+    @classmethod
+    def store_backed(cls, attr):
+        # attr を YAML ではなくデータストアから読んでいるか
+        return cls._store is not None and attr in cls.STORE_ATTRS
 
     @classmethod
     def initialize(cls):
-        cls.MOVES_DATA = cls.load_data('moves_data.yml')
-        cls.POKEMON_DATA = cls.load_data('pokemon_data.yml')
-        cls.NATURES = cls.load_data('natures.yml')
+        # すべてのデータをすぐに読み込む (常駐するサーバー向け)
+        # 共有データは書き換えられないように読み取り専用にしておく
+        from .move import MoveSpec
+        from .nature import NatureTable
+        from .species import Species
+        from .stats import STAT_CACHE
+        from .type_chart import TypeChart
+        with cls._lock:
+            # ファイルはここで読み終え、種族・わざの各要素は参照されたときに読み取り専用で復元する
+            cls.MOVES_DATA = _freeze(cls.load_data('moves_data.yml', lazy=cls.LAZY_ENTRIES))
+            cls.POKEMON_DATA = _freeze(cls.load_data('pokemon_data.yml', lazy=cls.LAZY_ENTRIES))
+            cls.NATURES = _freeze(cls.load_data('natures.yml', lazy=cls.LAZY_ENTRIES))
+            cls.TYPE_CHART = _freeze(cls.load_data('type_chart.yml', lazy=cls.LAZY_ENTRIES))
+            cls._store = None
+            # 読み込み直したデータで作り直させる (Species.clear_cache で世代も進む)
+            Species.clear_cache()
+            MoveSpec.clear_cache()
+            NatureTable.clear_cache()
+            TypeChart.clear_cache()
+            STAT_CACHE.clear()
+
+    @classmethod
+    def use_store(cls, path):
+        # メモリマップしたデータストアから種族・わざを直接読む
+        from .move import MoveSpec
+        from .species import Species
+        from .store import GameDataStore
+        store = GameDataStore(path)
+        with cls._lock:
+            cls.POKEMON_DATA = store.pokemon_data
+            cls.MOVES_DATA = store.moves_data
+            cls._store = store
+            Species.clear_cache()
+            MoveSpec.clear_cache()
+        return store
 
-# Config の初期化
-Config.initialize()
+if os.environ.get('POKEMON_DATA_STORE'):
+    Config.use_store(os.environ['POKEMON_DATA_STORE'])
+# POKEMON_EAGER_LOAD が設定されていれば import 時に初期化する
+elif os.environ.get('POKEMON_EAGER_LOAD'):
+    Config.initialize()
@@ -0,0 +1,174 @@
+from array import array
+from itertools import chain, repeat
+from operator import attrgetter
+from typing import Optional, Sequence, TYPE_CHECKING, Union
+from .stats import STAT_INDEX
+from .type_chart import TypeChart
+
+if TYPE_CHECKING:
+    from .move import MoveSlot, MoveSpec
+    from .pokemon import Pokemon
+
+PHYSICAL = 'ぶつり'
+SPECIAL = 'とくしゅ'
+STATUS = 'へんか'
+
+# 乱数補正は 85〜100 (%)
+MIN_ROLL = 85
+MAX_ROLL = 100
+
+ATTACK = STAT_INDEX['attack']
+DEFENSE = STAT_INDEX['defense']
+SP_ATTACK = STAT_INDEX['sp_attack']
+SP_DEFENSE = STAT_INDEX['sp_defense']
+
+"""
+ダメージ : ( ( レベル×2÷5+2 ) × 威力 × 攻撃÷防御 ) ÷50 + 2
+           × 乱数(85〜100)÷100 × タイプ一致 1.5 × タイプ相性
+各段階で小数点以下切り捨て。相性が 0 でなければ最低 1
+"""
+def calculate_damage(level: int, power: int, attack: int, defense: int,
+                     stab: bool, effectiveness: int, roll: int = MAX_ROLL) -> int:
+    # effectiveness は TypeChart.effectiveness と同じ 4 倍スケール
+    if not power or effectiveness == 0:
+        return 0
+    damage = (2 * level // 5 + 2) * power * attack // defense // 50 + 2
+    damage = damage * roll // 100
+    if stab:
+        damage = damage * 3 // 2
+    damage = damage * effectiveness // (TypeChart.SCALE ** 2)
+    return max(1, damage)
+
+def damage_batch(levels, powers, attacks, defenses, stab, effectiveness, rolls=MAX_ROLL):
+    # calculate_damage と同じ整数演算を NumPy 配列でまとめて行う
+    import numpy as np
+    levels, powers, attacks, defenses, effectiveness, rolls = (
+        np.asarray(column, dtype=np.int64)
+        for column in (levels, powers, attacks, defenses, effectiveness, rolls))
+    damage = (2 * levels // 5 + 2) * powers * attacks // defenses // 50 + 2
+    damage = damage * rolls // 100
+    damage = np.where(np.asarray(stab, dtype=bool), damage * 3 // 2, damage)
+    damage = np.maximum(1, damage * effectiveness // (TypeChart.SCALE ** 2))
+    return np.where((powers > 0) & (effectiveness > 0), damage, 0)
+
+
+Move = Union['MoveSpec', 'MoveSlot']
+
+class DamageCalculator:
+    # これより少ない組み合わせは、配列を用意する手間の方が大きいので1件ずつ計算する
+    VECTORIZE_MIN = 512
+    # 異なる個体の割合がこれ以下なら表を作ってまとめて計算する
+    DISTINCT_RATIO = 0.25
+
+    def __init__(self, type_chart: TypeChart = None):
+        self.type_chart = type_chart or TypeChart.default()
+
+    @staticmethod
+    def _stat_indices(category: str):
+        if category == PHYSICAL:
+            return ATTACK, DEFENSE
+        return SP_ATTACK, SP_DEFENSE
+
+    def damage(self, attacker: 'Pokemon', defender: 'Pokemon', move: Move, roll: int = MAX_ROLL) -> int:
+        if move.category == STATUS:
+            return 0
+        attack, defense = self._stat_indices(move.category)
+        return calculate_damage(
+            attacker.level, move.power or 0, attacker._stats[attack], defender._stats[defense],
+            move.type in attacker.types, self.type_chart.effectiveness(move.type, defender.types), roll)
+
+    def damage_many(self, attackers: Sequence['Pokemon'], defenders: Sequence['Pokemon'],
+                    moves: Sequence[Move], rolls=MAX_ROLL, table: Optional['DamageTable'] = None):
+        # 同じロスター・わざで何度も呼ぶときは、DamageTable を作って table に渡すと表を作り直さずに済む
+        if not len(attackers) == len(defenders) == len(moves):
+            raise ValueError("攻撃側・防御側・わざの数が一致しません。")
+        if table is not None:
+            return table.damage_of(attackers, defenders, moves, rolls)
+        n = len(moves)
+        if n >= self.VECTORIZE_MIN and self._repeats_enough(attackers, defenders):
+            pokemon_index, pokemon = _unique(list(attackers) + list(defenders))
+            move_index, specs = _unique([getattr(m, 'spec', m) for m in moves])
+            table = DamageTable(pokemon, specs, self.type_chart)
+            return table.damage(pokemon_index[:n], pokemon_index[n:], move_index, rolls)
+        return self._damage_each(attackers, defenders, moves, rolls)
+
+    @classmethod
+    def _repeats_enough(cls, attackers: Sequence['Pokemon'], defenders: Sequence['Pokemon']) -> bool:
+        # 表を作る手間は異なる個体の数に比例し、1体あたり1件分の計算と同じくらいかかるので、
+        # 同じ個体が十分に繰り返し現れるときだけ表を作る (Pokemon の hash は id なので数えるのは速い)
+        distinct = len(set(chain(attackers, defenders)))
+        return distinct <= (len(attackers) + len(defenders)) * cls.DISTINCT_RATIO
+
+    def _damage_each(self, attackers: Sequence['Pokemon'], defenders: Sequence['Pokemon'],
+                     moves: Sequence[Move], rolls):
+        import numpy as np
+        if isinstance(rolls, (int, np.integer)):
+            rolls = repeat(rolls)
+        return np.fromiter(map(self.damage, attackers, defenders, moves, rolls), dtype=np.int64, count=len(moves))
+
+
+def _unique(items: list):
+    # 同じオブジェクトを1つにまとめ、各要素が何番目のオブジェクトかを返す (ループは C 側で回す)
+    import numpy as np
+    ids = list(map(id, items))
+    objects = dict(zip(ids, items))
+    positions = dict(zip(objects, range(len(objects))))
+    index = np.fromiter(map(positions.__getitem__, ids), dtype=np.intp, count=len(ids))
+    return index, list(objects.values())
+
+
+# ポケモンとわざの数値を配列にまとめておき、番号の組でダメージを一括計算する
+class DamageTable:
+    def __init__(self, pokemon: Sequence['Pokemon'], moves: Sequence['MoveSpec'], type_chart: TypeChart = None):
+        import numpy as np
+        chart = type_chart or TypeChart.default()
+        self.type_chart = chart
+        self._matrix = chart.as_array()
+        n = len(pokemon)
+        # 1体ずつ属性を読むループは C 側 (map / attrgetter) で回す
+        self.levels = np.fromiter(map(attrgetter('_level'), pokemon), dtype=np.int64, count=n)
+        stats = array('H')
+        for values in map(attrgetter('_stats'), pokemon):
+            stats.extend(values)
+        self.stats = np.frombuffer(stats, dtype=np.uint16).astype(np.int64).reshape(n, -1)
+        # タイプの組は種族で共有しているので、組ごとに番号を振ってから表を引く
+        types = list(map(attrgetter('types'), pokemon))
+        pairs = {pair: i for i, pair in enumerate(set(types))}
+        pair_ids = np.array([chart.defender_ids(pair) for pair in pairs], dtype=np.int64).reshape(-1, 2)
+        self.types = pair_ids[np.fromiter(map(pairs.__getitem__, types), dtype=np.intp, count=n)]
+        self.powers = np.array([0 if m.category == STATUS else m.power or 0 for m in moves], dtype=np.int64)
+        self.physical = np.array([m.category == PHYSICAL for m in moves], dtype=bool)
+        self.move_types = np.array([chart.type_id(m.type) for m in moves], dtype=np.int64)
+        # damage_of で個体・わざから行番号を引くための対応表。id が使い回されないよう本体も持っておく
+        self._pokemon = list(pokemon)
+        self._moves = list(moves)
+        self._pokemon_rows = dict(zip(map(id, self._pokemon), range(n)))
+        self._move_rows = dict(zip(map(id, self._moves), range(len(self._moves))))
+
+    def damage(self, attackers, defenders, moves, rolls=MAX_ROLL):
+        import numpy as np
+        attackers, defenders, moves = (np.asarray(i, dtype=np.intp) for i in (attackers, defenders, moves))
+        physical = self.physical[moves]
+        attacks = np.where(physical, self.stats[attackers, ATTACK], self.stats[attackers, SP_ATTACK])
+        defenses = np.where(physical, self.stats[defenders, DEFENSE], self.stats[defenders, SP_DEFENSE])
+        move_types = self.move_types[moves]
+        stab = (self.types[attackers, 0] == move_types) | (self.types[attackers, 1] == move_types)
+        effectiveness = (self._matrix[move_types, self.types[defenders, 0]]
+                         * self._matrix[move_types, self.types[defenders, 1]])
+        return damage_batch(self.levels[attackers], self.powers[moves], attacks, defenses,
+                            stab, effectiveness, rolls)
+
+    def damage_of(self, attackers: Sequence['Pokemon'], defenders: Sequence['Pokemon'],
+                  moves: Sequence[Move], rolls=MAX_ROLL):
+        """表に含まれる個体・わざの組でダメージを求める。ステータスとレベルは表を作った時点の値を使う"""
+        import numpy as np
+        n = len(moves)
+        rows = self._pokemon_rows.__getitem__
+        try:
+            attacker_rows = np.fromiter(map(rows, map(id, attackers)), dtype=np.intp, count=n)
+            defender_rows = np.fromiter(map(rows, map(id, defenders)), dtype=np.intp, count=n)
+            move_rows = np.fromiter(map(self._move_rows.__getitem__, (id(getattr(m, 'spec', m)) for m in moves)),
+                                    dtype=np.intp, count=n)
+        except KeyError:
+            raise ValueError("DamageTable に含まれていない個体かわざがあります。") from None
+        return self.damage(attacker_rows, defender_rows, move_rows, rolls)
@@ -1,14 +1,169 @@
-import yaml
+import hashlib
+import marshal
 import os
-from typing import Dict
+import struct
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Mapping, Optional, Union
+
+def frozen(value: Any) -> Any:
+    # 共有するデータを中まで読み取り専用にする (dict は MappingProxyType、list は tuple に)
+    if isinstance(value, dict):
+        return MappingProxyType({key: frozen(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(frozen(item) for item in value)
+    return value
+
+# 最上位が dict のデータを、要素ごとに必要になった時点で復元するマッピング
+class LazyDict(Mapping):
+    def __init__(self, blobs: Dict[Any, bytes]):
+        self._blobs = blobs
+        self._values: Dict[Any, Any] = {}
+
+    def __getitem__(self, key: Any) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        # 復元した値はすべての呼び出し元で共有するので、書き換えられないようにしておく
+        value = frozen(marshal.loads(self._blobs[key]))
+        # 複数スレッドから同時に復元されても同じオブジェクトを返す
+        return self._values.setdefault(key, value)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._blobs
+
+    def __iter__(self) -> Iterator:
+        return iter(self._blobs)
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def materialize(self) -> Dict:
+        return {key: self[key] for key in self._blobs}
+
+    def blob(self, key: Any) -> bytes:
+        # 要素を復元せずに比較するための、marshal したままのバイト列
+        return self._blobs[key]
+
 
 class DataLoader:
+    # YAML を解析した結果を marshal 形式でキャッシュする
+    CACHE_DIR = '__pycache__'
+    CACHE_MAGIC = b'PKYC'
+    CACHE_VERSION = 2
+    # マジック, バージョン, 元ファイルの mtime_ns, サイズ, BLAKE2b ハッシュ
+    CACHE_HEADER = struct.Struct('<4sHqQ32s')
+
+    use_cache = not os.environ.get('POKEMON_NO_DATA_CACHE')
+
     @staticmethod
     def load_data(file_path: str) -> Dict:
+        return DataLoader._materialize(DataLoader._load(file_path))
+
+    @staticmethod
+    def load_lazy(file_path: str) -> Union[LazyDict, Any]:
+        # キャッシュから読めた dict は要素単位で遅延復元する
+        data = DataLoader._load(file_path)
+        if isinstance(data, tuple):
+            return LazyDict(data[1])
+        return data
+
+    @staticmethod
+    def _load(file_path: str) -> Any:
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return yaml.safe_load(file)
+            stat = os.stat(file_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"{file_path} が見つかりません。")
+
+        if not DataLoader.use_cache:
+            with open(file_path, 'rb') as file:
+                return DataLoader._parse_yaml(file.read())
+
+        cache_path = DataLoader.cache_path(file_path)
+        header = DataLoader._read_cache_header(cache_path)
+        if header is not None and (header[2], header[3]) == (stat.st_mtime_ns, stat.st_size):
+            data = DataLoader._read_cache(cache_path)
+            if data is not None:
+                return data
+
+        with open(file_path, 'rb') as file:
+            source = file.read()
+        digest = hashlib.blake2b(source, digest_size=32).digest()
+        if header is not None and header[4] == digest:
+            # 内容が同じなら mtime だけ更新されたとみなしてキャッシュを使う
+            data = DataLoader._read_cache(cache_path)
+            if data is not None:
+                DataLoader._write_cache(cache_path, stat, digest, data)
+                return data
+
+        data = DataLoader._pack(DataLoader._parse_yaml(source))
+        DataLoader._write_cache(cache_path, stat, digest, data)
+        return data
+
+    @staticmethod
+    def _pack(data: Any) -> Any:
+        # dict は要素ごとに marshal しておき、('dict', {キー: bytes}) として保存する
+        if isinstance(data, dict):
+            return ('dict', {key: marshal.dumps(value) for key, value in data.items()})
+        return data
+
+    @staticmethod
+    def _materialize(data: Any) -> Any:
+        if isinstance(data, tuple):
+            return {key: marshal.loads(blob) for key, blob in data[1].items()}
+        return data
+
+    @staticmethod
+    def cache_path(file_path: str) -> str:
+        directory, filename = os.path.split(os.path.abspath(file_path))
+        return os.path.join(directory, DataLoader.CACHE_DIR,
+                            f"{filename}.v{DataLoader.CACHE_VERSION}.marshal")
+
+    @staticmethod
+    def _parse_yaml(source: bytes) -> Dict:
+        # PyYAML の import も重いので、キャッシュが使えないときだけ読み込む
+        import yaml
+        # libyaml があれば C 実装のローダーを使う (結果は SafeLoader と同じ)
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        try:
+            return yaml.load(source.decode('utf-8'), Loader=loader)
         except yaml.YAMLError as e:
             raise yaml.YAMLError(f"YAMLファイルの読み込み中にエラーが発生しました: {e}")
+
+    @staticmethod
+    def _read_cache_header(cache_path: str) -> Optional[tuple]:
+        try:
+            with open(cache_path, 'rb') as file:
+                header = DataLoader.CACHE_HEADER.unpack(file.read(DataLoader.CACHE_HEADER.size))
+        except (OSError, struct.error):
+            return None
+        if header[0] != DataLoader.CACHE_MAGIC or header[1] != DataLoader.CACHE_VERSION:
+            return None
+        return header
+
+    @staticmethod
+    def _read_cache(cache_path: str) -> Any:
+        try:
+            with open(cache_path, 'rb') as file:
+                file.seek(DataLoader.CACHE_HEADER.size)
+                return marshal.load(file)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def _write_cache(cache_path: str, stat: os.stat_result, digest: bytes, data: Any) -> None:
+        # キャッシュが書けなくても読み込み自体は成功させる
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(tmp_path, 'wb') as file:
+                file.write(DataLoader.CACHE_HEADER.pack(
+                    DataLoader.CACHE_MAGIC, DataLoader.CACHE_VERSION,
+                    stat.st_mtime_ns, stat.st_size, digest))
+                marshal.dump(data, file)
+            os.replace(tmp_path, cache_path)
+        except (OSError, ValueError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
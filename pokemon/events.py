@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple, TYPE_CHECKING, Union
+from .stats import STAT_NAMES
+
+if TYPE_CHECKING:
+    from .pokemon import Pokemon
+
+
+# レベルアップ・わざの習得で発生するイベント
+@dataclass(frozen=True)
+class ExpGained:
+    name: str
+    amount: int
+
+@dataclass(frozen=True)
+class StatDelta:
+    stat: str
+    old: int
+    new: int
+
+    @property
+    def increase(self) -> int:
+        return self.new - self.old
+
+@dataclass(frozen=True)
+class LevelUp:
+    name: str
+    level: int
+    deltas: Tuple[StatDelta, ...] = ()
+
+@dataclass(frozen=True)
+class MoveLearned:
+    name: str
+    move: str
+    forgotten: Optional[str] = None
+
+@dataclass(frozen=True)
+class MoveLearnPending:
+    name: str
+    move: str
+    current_moves: Tuple[str, ...]
+
+@dataclass(frozen=True)
+class MoveNotLearned:
+    name: str
+    move: str
+    invalid_choice: bool = False
+
+
+Event = Union[ExpGained, LevelUp, MoveLearned, MoveLearnPending, MoveNotLearned]
+# イベントを受け取る関数
+EventSink = Callable[[Event], None]
+# わざが4つあるときに、わすれさせる枠 (0〜3) を返す。None ならおぼえない
+MovePolicy = Callable[['Pokemon', str], Optional[int]]
+
+
+# 従来どおり標準出力に表示する
+class ConsoleSink:
+    def __call__(self, event: Event) -> None:
+        if isinstance(event, ExpGained):
+            print(f"{event.name}は{event.amount}のけいけんちをもらった！")
+        elif isinstance(event, LevelUp):
+            print(f"{event.name}は\nレベル{event.level}にあがった！")
+            for delta in event.deltas:
+                if delta.increase > 0:
+                    print(f"{STAT_NAMES[delta.stat]}が{delta.increase}あがった！")
+            print("\n")
+        elif isinstance(event, MoveLearned):
+            if event.forgotten is None:
+                print(f"{event.name}は{event.move}をおぼえた!")
+            else:
+                print(f"{event.name}は{event.forgotten}をわすれて{event.move}をおぼえました!")
+        elif isinstance(event, MoveLearnPending):
+            print(f"{event.name}は新しく{event.move}を覚えようとしている！")
+            print(f"{event.name}はすでに４つのわざをおぼえています。わすれさせるわざを選んでください。")
+            for i, move in enumerate(event.current_moves):
+                print(f"{i+1}: {move}")
+            print(f"5: {event.move}をおぼえるのをやめる")
+            print("\n")
+            print("どのわざをわすれさせますか？")
+        elif isinstance(event, MoveNotLearned):
+            if event.invalid_choice:
+                print("ばんごうがまちがっています。わざをおぼえなかった")
+            else:
+                print(f"{event.name}は{event.move}をおぼえなかった")
+
+# イベントをリストにためる
+class EventLog(list):
+    def __call__(self, event: Event) -> None:
+        self.append(event)
+
+def discard_events(event: Event) -> None:
+    pass
+
+
+def console_policy(pokemon: 'Pokemon', new_move_name: str) -> Optional[int]:
+    try:
+        choice = int(input("わすれさせるわざのばんごうをえらんでください。"))
+    except ValueError:
+        return -1
+    if choice == 5:
+        return None
+    return choice - 1
+
+def keep_moves_policy(pokemon: 'Pokemon', new_move_name: str) -> Optional[int]:
+    return None
+
+def replace_oldest_policy(pokemon: 'Pokemon', new_move_name: str) -> Optional[int]:
+    return 0
+
+
+CONSOLE_SINK = ConsoleSink()
+
+
+def default_policy(sink: EventSink) -> MovePolicy:
+    # 画面に出すときだけ入力で選ばせる。ほかの sink (サーバーなど) では入力を待たずに今のわざを残す
+    return console_policy if isinstance(sink, ConsoleSink) else keep_moves_policy
@@ -1,41 +1,85 @@
 from abc import ABC, abstractmethod
+from bisect import bisect_right
+from typing import Dict, Tuple
 import math
 
 class ExpStrategy(ABC):
+    GROWTH: str = ''
+    MAX_LEVEL = 100
+
+    def __init__(self) -> None:
+        # レベル→累計経験値のテーブルは一度だけ計算して共有する
+        self._table: Tuple[int, ...] = self._build_table()
+
     @abstractmethod
     def calculate_exp(self, level: int) -> int:
         pass
 
+    def _build_table(self) -> Tuple[int, ...]:
+        table = [0, 0]
+        for level in range(2, self.MAX_LEVEL + 1):
+            table.append(self.calculate_exp(level))
+        return tuple(table)
+
+    @property
+    def table(self) -> Tuple[int, ...]:
+        return self._table
+
+    def exp_for_level(self, level: int) -> int:
+        if 0 <= level <= self.MAX_LEVEL:
+            return self._table[level]
+        return self.calculate_exp(level)
+
+    def level_for_exp(self, exp: int) -> int:
+        # 累計経験値 exp で到達できる最大レベル (1〜MAX_LEVEL)
+        return max(1, bisect_right(self._table, exp, 1) - 1)
+
+    def __reduce__(self):
+        # プロセス間で受け渡してもシングルトンを保つ
+        return get_exp_strategy, (self.GROWTH,)
+
 class Exp600k(ExpStrategy):
+    GROWTH = '600k'
+
     def calculate_exp(self, level: int) -> int:
         if 2 <= level <= 50:
             return math.floor(level**3 * (100 - level) / 50)
         elif 50 < level <= 68:
             return math.floor(level**3 * (150 - level) / 100)
         elif 68 < level <= 98:
-            return math.floor(level**3 * math.floor((637 - 10*level) / 3) / 500)
-        elif level == 99:
+            return math.floor(level**3 * math.floor((1911 - 10*level) / 3) / 500)
+        elif 98 < level <= 100:
             return math.floor(level**3 * (160 - level) / 100)
         else:
             raise ValueError("Invalid level")
 
 class Exp800k(ExpStrategy):
+    GROWTH = '800k'
+
     def calculate_exp(self, level: int) -> int:
         return math.floor(0.8 * level**3)
 
 class Exp1000k(ExpStrategy):
+    GROWTH = '1000k'
+
     def calculate_exp(self, level: int) -> int:
         return level**3
 
 class Exp1050k(ExpStrategy):
+    GROWTH = '1050k'
+
     def calculate_exp(self, level: int) -> int:
         return math.floor(1.2 * level**3 - 15 * level**2 + 100 * level - 140)
 
 class Exp1250k(ExpStrategy):
+    GROWTH = '1250k'
+
     def calculate_exp(self, level: int) -> int:
         return math.floor(1.25 * level**3)
 
 class Exp1640k(ExpStrategy):
+    GROWTH = '1640k'
+
     def calculate_exp(self, level: int) -> int:
         if 2 <= level <= 15:
             return math.floor(level**3 * (24 + math.floor((level + 1) / 3)) / 50)
@@ -45,3 +89,15 @@ class Exp1640k(ExpStrategy):
             return math.floor(level**3 * (32 + math.floor(level / 2)) / 50)
         else:
             raise ValueError("Invalid level")
+
+# 経験値成長率の文字列 → 共有インスタンス
+EXP_STRATEGIES: Dict[str, ExpStrategy] = {
+    strategy.GROWTH: strategy
+    for strategy in (Exp600k(), Exp800k(), Exp1000k(), Exp1050k(), Exp1250k(), Exp1640k())
+}
+
+def get_exp_strategy(exp_growth: str) -> ExpStrategy:
+    try:
+        return EXP_STRATEGIES[exp_growth]
+    except KeyError:
+        raise ValueError(f"不正な経験値成長率です: {exp_growth}") from None
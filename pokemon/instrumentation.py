@@ -0,0 +1,174 @@
+"""主要な処理の呼び出し回数と累計時間を記録する計測フック
+
+    from pokemon import instrumentation
+    instrumentation.enable()
+    ...
+    print(instrumentation.to_prometheus())
+
+enable() したときだけ対象のメソッドを計測用のラッパーに差し替え、disable() で元に戻す。
+無効なときは元のメソッドがそのまま呼ばれるので、余分なコストはかからない。
+環境変数 POKEMON_INSTRUMENT を設定すると pokemon.pokemon の読み込み時に有効になる。
+"""
+import cProfile
+import functools
+import json
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from .config import Config
+from .data_loader import DataLoader
+from .pokemon import Pokemon
+
+# (クラス, 属性名) の一覧。表示名は「クラス名.属性名」
+TARGETS: List[Tuple[type, str]] = [
+    (Config, 'initialize'),
+    (DataLoader, 'load_data'),
+    (DataLoader, 'load_lazy'),
+    (Pokemon, '__init__'),
+    (Pokemon, 'set_level'),
+    (Pokemon, 'calculate_stats'),
+    (Pokemon, 'gain_exp'),
+    (Pokemon, '_add_move'),
+]
+
+
+class CallStats:
+    __slots__ = ('calls', 'errors', 'total', 'max')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {'calls': self.calls, 'errors': self.errors, 'total_seconds': self.total,
+                'max_seconds': self.max}
+
+
+_lock = threading.Lock()
+_stats: Dict[str, CallStats] = {f"{owner.__name__}.{name}": CallStats() for owner, name in TARGETS}
+# 差し替える前の属性 (classmethod / staticmethod はそのままの形で保存する)
+_originals: Dict[Tuple[type, str], object] = {}
+
+
+def _wrap(func: Callable, stats: CallStats) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        failed = False
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = perf_counter() - start
+            with _lock:
+                stats.calls += 1
+                stats.total += elapsed
+                if failed:
+                    stats.errors += 1
+                if elapsed > stats.max:
+                    stats.max = elapsed
+    return wrapper
+
+
+def enable() -> None:
+    with _lock:
+        for owner, name in TARGETS:
+            if (owner, name) in _originals:
+                continue
+            original = owner.__dict__[name]
+            stats = _stats[f"{owner.__name__}.{name}"]
+            if isinstance(original, classmethod):
+                patched = classmethod(_wrap(original.__func__, stats))
+            elif isinstance(original, staticmethod):
+                patched = staticmethod(_wrap(original.__func__, stats))
+            else:
+                patched = _wrap(original, stats)
+            _originals[(owner, name)] = original
+            setattr(owner, name, patched)
+
+
+def disable() -> None:
+    with _lock:
+        for (owner, name), original in _originals.items():
+            setattr(owner, name, original)
+        _originals.clear()
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def reset() -> None:
+    with _lock:
+        for name in _stats:
+            _stats[name] = CallStats()
+        # 有効な間はラッパーが古い CallStats を持っているので、差し替え直す
+        enabled = bool(_originals)
+    if enabled:
+        disable()
+        enable()
+
+
+@contextmanager
+def instrumented(clear: bool = True) -> Iterator[None]:
+    """ブロックの間だけ計測を有効にする"""
+    if clear:
+        reset()
+    was_enabled = is_enabled()
+    enable()
+    try:
+        yield
+    finally:
+        if not was_enabled:
+            disable()
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    with _lock:
+        return {name: stats.as_dict() for name, stats in _stats.items()}
+
+
+def to_json(indent: Optional[int] = None) -> str:
+    return json.dumps(snapshot(), indent=indent)
+
+
+def to_prometheus(prefix: str = 'pokemon') -> str:
+    """Prometheus のテキスト形式で出力する"""
+    metrics = (
+        ('calls_total', 'counter', 'calls', '呼び出し回数'),
+        ('errors_total', 'counter', 'errors', '例外で終わった呼び出しの回数'),
+        ('seconds_total', 'counter', 'total_seconds', '累計実行時間 (秒)'),
+        ('max_seconds', 'gauge', 'max_seconds', '1回あたりの最大実行時間 (秒)'),
+    )
+    current = snapshot()
+    lines = []
+    for suffix, kind, key, description in metrics:
+        metric = f"{prefix}_{suffix}"
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, values in current.items():
+            lines.append(f'{metric}{{function="{name}"}} {values[key]}')
+    return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def profile(path: Optional[str] = None) -> Iterator[cProfile.Profile]:
+    """ブロックを cProfile で計測する。path を指定すると pstats 形式で保存する
+
+        with profile() as profiler:
+            ...
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path is not None:
+            profiler.dump_stats(path)
@@ -0,0 +1,101 @@
+from bisect import bisect_left, bisect_right
+from types import MappingProxyType
+from typing import ClassVar, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# レベル順に並べた覚えるわざの一覧。レベル L までに覚えるわざは先頭からの連続区間になる
+class Learnset:
+    __slots__ = ('level_up_moves', 'levels', 'moves')
+
+    def __init__(self, level_up_moves: Mapping[int, Sequence[str]]):
+        # 種族の Learnset は個体どうしで共有するので、渡された dict の読み取り専用の写しを持つ
+        self.level_up_moves: Mapping[int, Tuple[str, ...]] = MappingProxyType(
+            {level: tuple(moves) for level, moves in level_up_moves.items()})
+        entries = sorted(((level, move) for level, moves in level_up_moves.items() for move in moves),
+                         key=lambda entry: entry[0])
+        self.levels: Tuple[int, ...] = tuple(level for level, _ in entries)
+        self.moves: Tuple[str, ...] = tuple(move for _, move in entries)
+
+    def moves_up_to(self, level: int) -> Tuple[str, ...]:
+        return self.moves[:bisect_right(self.levels, level)]
+
+    def last_moves(self, level: int, count: int = 4) -> Tuple[str, ...]:
+        end = bisect_right(self.levels, level)
+        return self.moves[max(0, end - count):end]
+
+    def moves_at(self, level: int) -> Tuple[str, ...]:
+        return self.moves[bisect_left(self.levels, level):bisect_right(self.levels, level)]
+
+    def moves_between(self, low: int, high: int) -> Tuple[str, ...]:
+        # low < レベル <= high で覚えるわざ
+        return self.moves[bisect_right(self.levels, low):bisect_right(self.levels, high)]
+
+    def first_level(self, move: str) -> Optional[int]:
+        for level, name in zip(self.levels, self.moves):
+            if name == move:
+                return level
+        return None
+
+
+# 全種族の Learnset と、わざ → (種族, 覚える最低レベル) の逆引き索引。
+# わざごとに種族をレベル順に並べておくので、「レベル L までに覚える種族」は先頭からの区間になる
+class LearnsetIndex:
+    _default: ClassVar[Optional['LearnsetIndex']] = None
+
+    def __init__(self, learnsets: Mapping[str, Learnset]):
+        self.learnsets: Dict[str, Learnset] = dict(learnsets)
+        first_levels: Dict[str, Dict[str, int]] = {}
+        for species, learnset in self.learnsets.items():
+            for level, move in zip(learnset.levels, learnset.moves):
+                # Learnset はレベル順なので、最初に現れたレベルが最低レベル
+                first_levels.setdefault(move, {}).setdefault(species, level)
+        self._levels: Dict[str, Tuple[int, ...]] = {}
+        self._species: Dict[str, Tuple[str, ...]] = {}
+        for move, by_species in first_levels.items():
+            entries = sorted(by_species.items(), key=lambda entry: (entry[1], entry[0]))
+            self._levels[move] = tuple(level for _, level in entries)
+            self._species[move] = tuple(species for species, _ in entries)
+
+    @classmethod
+    def default(cls) -> 'LearnsetIndex':
+        # Config.POKEMON_DATA の全種族から一度だけ作る。Learnset は Species と共有する
+        if cls._default is None:
+            from .config import Config
+            from .species import Species
+            cls._default = cls({name: Species.get(name).learnset for name in Config.POKEMON_DATA})
+        return cls._default
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._default = None
+
+    def learnset(self, species: str) -> Learnset:
+        learnset = self.learnsets.get(species)
+        if learnset is None:
+            raise ValueError(f"{species} というポケモンはデータベースにありません。")
+        return learnset
+
+    def moves_up_to(self, species: str, level: int) -> Tuple[str, ...]:
+        return self.learnset(species).moves_up_to(level)
+
+    def learners(self, move: str) -> Tuple[Tuple[str, int], ...]:
+        """move を覚える種族と、覚える最低レベルの組をレベル順に返す"""
+        return tuple(zip(self._species.get(move, ()), self._levels.get(move, ())))
+
+    def species_learning(self, move: str, level: int = 100) -> Tuple[str, ...]:
+        """レベル level までに move を覚える種族"""
+        species = self._species.get(move, ())
+        return species[:bisect_right(self._levels.get(move, ()), level)]
+
+    def species_learning_all(self, moves: Iterable[str], level: int = 100) -> List[str]:
+        """レベル level までに moves をすべて覚える種族 (名前順)"""
+        result = None
+        for move in moves:
+            learners = set(self.species_learning(move, level))
+            result = learners if result is None else result & learners
+            if not result:
+                return []
+        return sorted(result or ())
+
+    def can_learn(self, species: str, move: str, level: int = 100) -> bool:
+        first = self.learnset(species).first_level(move)
+        return first is not None and first <= level
@@ -0,0 +1,83 @@
+"""トップレベルの pokemon.py (旧 API) の実装
+
+旧 API の呼び出し方をそのまま受け付けるが、中身は pokemon.pokemon.Pokemon と同じで、
+データの読み込み結果・経験値テーブル・性格の一覧もパッケージ側と共有する。
+わざは dict のコピーではなく、slot['name'] のように読める MoveSlot のビューで返す。
+"""
+import os
+from typing import Any, Dict, List, Optional, Union
+from .config import Config
+from .data_loader import DataLoader
+from .exp_strategy import ExpStrategy, get_exp_strategy
+from .learnset import Learnset
+from .nature import Nature, NatureTable
+from .pokemon import Pokemon as _Pokemon
+from .species import Species
+
+__all__ = ['Nature', 'NATURES', 'Pokemon', 'load_data']
+
+# データディレクトリにあるファイルは Config と同じオブジェクトを返す
+_SHARED = {
+    'moves_data.yml': 'MOVES_DATA',
+    'pokemon_data.yml': 'POKEMON_DATA',
+    'natures.yml': 'NATURES',
+    'type_chart.yml': 'TYPE_CHART',
+}
+
+
+def load_data(file_path: str) -> Optional[Any]:
+    if not os.path.exists(file_path):
+        file_path = os.path.join(Config.DATA_DIR, file_path)
+    path = os.path.abspath(file_path)
+    try:
+        attr = _SHARED.get(os.path.basename(path))
+        if attr is not None and os.path.dirname(path) == os.path.abspath(Config.DATA_DIR):
+            return getattr(Config, attr)
+        return DataLoader.load_data(path)
+    except FileNotFoundError as e:
+        print(e)
+        return None
+    except Exception as e:
+        import yaml
+        if not isinstance(e, yaml.YAMLError):
+            raise
+        print(e)
+        return None
+
+
+class Pokemon(_Pokemon):
+    __slots__ = ()
+
+    moves_data = None
+
+    @classmethod
+    def initialize_moves_data(cls) -> None:
+        if cls.moves_data is None:
+            cls.moves_data = Config.MOVES_DATA
+
+    def __init__(self, name: str, types: Union[str, List[str]], base_stats: Dict[str, int],
+                 level_up_moves: Union[Dict[int, List[str]], Learnset], exp_growth: Union[str, ExpStrategy],
+                 level: int = 1):
+        self.initialize_moves_data()
+        # 成長率の文字列は共有の経験値テーブルに置き換える
+        exp_strategy = exp_growth if isinstance(exp_growth, ExpStrategy) else get_exp_strategy(exp_growth)
+        super().__init__(name, types, base_stats, level_up_moves, exp_strategy, level)
+
+    @property
+    def exp_growth(self) -> str:
+        return self.exp_strategy.GROWTH
+
+    def add_move(self, move_name: str) -> None:
+        self._add_move(move_name)
+
+    @staticmethod
+    def create_pokemon(name: str, level: int = 5) -> 'Pokemon':
+        species = Species.get(name)
+        return Pokemon(name, species.types, species.base_stats, species.learnset, species.exp_strategy, level)
+
+
+def __getattr__(name: str) -> Any:
+    # NATURES は参照されたときに読み込む
+    if name == 'NATURES':
+        return NatureTable.load()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,50 @@
+"""個体ごとのロック
+
+個体ごとに Lock を持たせるとメモリが増えるので、決まった数の RLock を用意し、
+id(個体) で振り分けて使う (ロックストライピング)。同じロックを共有する個体があっても、
+1つのスレッドが同時に持つのは1体分か、順番を揃えて取る複数体分だけなので、デッドロックしない。
+"""
+import functools
+import os
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Iterable, Iterator, TypeVar
+
+LOCK_STRIPES = int(os.environ.get('POKEMON_LOCK_STRIPES', 1024))
+_LOCKS = tuple(threading.RLock() for _ in range(LOCK_STRIPES))
+# 個体のロックとは別に、短い書き換えだけを守るロック。持っている間に他のロックは取らない
+_LEAF_LOCKS = tuple(threading.Lock() for _ in range(LOCK_STRIPES))
+
+F = TypeVar('F', bound=Callable)
+
+
+def _stripe(obj: object) -> int:
+    # オブジェクトのアドレスの下位ビットは揃っているので捨てる
+    return (id(obj) >> 4) % LOCK_STRIPES
+
+
+def lock_for(obj: object) -> threading.RLock:
+    return _LOCKS[_stripe(obj)]
+
+
+def leaf_lock_for(obj: object) -> threading.Lock:
+    """obj の中身を差し替える間だけ持つロック。持っている間に他のロックを取ってはいけない"""
+    return _LEAF_LOCKS[_stripe(obj)]
+
+
+@contextmanager
+def locked_all(objs: Iterable[object]) -> Iterator[None]:
+    """objs のロックをすべて取る。取る順番を揃えるので、他のスレッドとデッドロックしない"""
+    with ExitStack() as stack:
+        for stripe in sorted({_stripe(obj) for obj in objs}):
+            stack.enter_context(_LOCKS[stripe])
+        yield
+
+
+def synchronized(method: F) -> F:
+    """メソッドの実行中、self のロックを持つ"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with _LOCKS[(id(self) >> 4) % LOCK_STRIPES]:
+            return method(self, *args, **kwargs)
+    return wrapper
@@ -1,4 +1,8 @@
+from array import array
 from dataclasses import dataclass
+from typing import Any, ClassVar, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+from .config import Config
+from .locks import leaf_lock_for
 
 @dataclass
 class Move:
@@ -9,3 +13,191 @@ class Move:
     pp: int
     max_pp: int
     category: str
+
+# わざごとに不変な情報。すべてのポケモンで同じインスタンスを共有する
+@dataclass(frozen=True)
+class MoveSpec:
+    name: str
+    type: str
+    power: int
+    accuracy: Optional[int]
+    max_pp: int
+    category: str
+
+    _registry: ClassVar[Dict[str, 'MoveSpec']] = {}
+
+    @classmethod
+    def get(cls, name: str) -> 'MoveSpec':
+        spec = cls._registry.get(name)
+        if spec is None:
+            # Species.get と同じく、データの入れ替えと重ならないよう Config._lock の中で作る
+            with Config._lock:
+                spec = cls._registry.get(name)
+                if spec is None:
+                    data = Config.MOVES_DATA[name]
+                    spec = cls._registry[name] = cls(
+                        name=name,
+                        type=data['type'],
+                        power=data['power'],
+                        accuracy=data['accuracy'],
+                        max_pp=data['pp'],
+                        category=data['category']
+                    )
+        return spec
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._registry.clear()
+
+    @classmethod
+    def invalidate(cls, names: Iterable[str]) -> None:
+        for name in names:
+            cls._registry.pop(name, None)
+
+    def __reduce__(self):
+        return MoveSpec.get, (self.name,)
+
+# ポケモンが覚えているわざの1枠 (MoveSet 内の位置を指すビュー)。
+# 旧来の dict と同じく slot['name'] のようにも読める。
+# 取り出した時点の MoveSet の中身を読むので、他のスレッドが書き換えても途中の状態は見えない
+class MoveSlot:
+    __slots__ = ('_moveset', '_index', '_state')
+
+    FIELDS: ClassVar[Tuple[str, ...]] = ('name', 'type', 'power', 'accuracy', 'pp', 'max_pp', 'category')
+
+    def __init__(self, moveset: 'MoveSet', index: int, state: tuple):
+        self._moveset = moveset
+        self._index = index
+        self._state = state
+
+    @property
+    def spec(self) -> MoveSpec:
+        return self._state[self._index]
+
+    @property
+    def name(self) -> str:
+        return self.spec.name
+
+    @property
+    def type(self) -> str:
+        return self.spec.type
+
+    @property
+    def power(self) -> int:
+        return self.spec.power
+
+    @property
+    def accuracy(self) -> Optional[int]:
+        return self.spec.accuracy
+
+    @property
+    def max_pp(self) -> int:
+        return self.spec.max_pp
+
+    @property
+    def category(self) -> str:
+        return self.spec.category
+
+    @property
+    def pp(self) -> int:
+        return self._state[-1][self._index]
+
+    @pp.setter
+    def pp(self, value: int) -> None:
+        self._state = self._moveset._set_pp(self._index, value)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: int) -> None:
+        if key != 'pp':
+            raise KeyError(f"{key} は変更できません。")
+        self.pp = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.FIELDS
+
+    def __repr__(self) -> str:
+        return f"MoveSlot(name={self.name!r}, pp={self.pp}, max_pp={self.max_pp})"
+
+# 覚えているわざ。わざの情報は共有し、PP だけを個体ごとの配列で持つ
+class MoveSet(Sequence):
+    # (わざ1, わざ2, ..., PP の配列) の tuple を1つの属性で持ち、書き換えるときは tuple ごと差し替える。
+    # ロックを持たない読み手も、わざと PP の数が合わない途中の状態を見ることはない。
+    # 書き換えどうしの順序は、MoveSet ごとに振り分けたロック (leaf_lock_for) で守る
+    __slots__ = ('_state',)
+
+    def __init__(self, moves: Sequence[Union[MoveSpec, Move, Mapping, str]] = ()):
+        self._state: tuple = (array('B'),)
+        for move in moves:
+            self.append(move)
+
+    def __getitem__(self, index):
+        state = self._state
+        if isinstance(index, slice):
+            return [MoveSlot(self, i, state) for i in range(len(state) - 1)[index]]
+        if index < 0:
+            index += len(state) - 1
+        if not 0 <= index < len(state) - 1:
+            raise IndexError("わざの番号が範囲外です。")
+        return MoveSlot(self, index, state)
+
+    def __len__(self) -> int:
+        return len(self._state) - 1
+
+    def __iter__(self) -> Iterator[MoveSlot]:
+        state = self._state
+        return (MoveSlot(self, i, state) for i in range(len(state) - 1))
+
+    def __setitem__(self, index: int, move: Union[MoveSpec, Move, Mapping, str]) -> None:
+        spec, pp = self._resolve(move)
+        with leaf_lock_for(self):
+            *specs, pps = self._state
+            pps = array('B', pps)
+            specs[index] = spec
+            pps[index] = pp
+            self._state = (*specs, pps)
+
+    def append(self, move: Union[MoveSpec, Move, Mapping, str], pp: Optional[int] = None) -> None:
+        spec, default_pp = self._resolve(move)
+        with leaf_lock_for(self):
+            *specs, pps = self._state
+            pps = array('B', pps)
+            pps.append(default_pp if pp is None else pp)
+            self._state = (*specs, spec, pps)
+
+    def clear(self) -> None:
+        with leaf_lock_for(self):
+            self._state = (array('B'),)
+
+    def _set_pp(self, index: int, value: int) -> tuple:
+        with leaf_lock_for(self):
+            *specs, pps = self._state
+            pps = array('B', pps)
+            pps[index] = value
+            self._state = state = (*specs, pps)
+        return state
+
+    @property
+    def specs(self) -> List[MoveSpec]:
+        return list(self._state[:-1])
+
+    @staticmethod
+    def _resolve(move: Union[MoveSpec, Move, Mapping, str]):
+        if isinstance(move, str):
+            move = MoveSpec.get(move)
+        if isinstance(move, MoveSpec):
+            return move, move.max_pp
+        if isinstance(move, Mapping):
+            # 旧来の dict 形式のわざ
+            spec = MoveSpec.get(move['name'])
+            return spec, move.get('pp', spec.max_pp)
+        return MoveSpec.get(move.name), move.pp
+
+    def __repr__(self) -> str:
+        return f"MoveSet({[slot.name for slot in self]!r})"
@@ -1,7 +1,9 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import ClassVar, Dict, Optional, Tuple
+from .config import Config
+from .stats import STAT_KEYS
 
-@dataclass
+@dataclass(frozen=True)
 class Nature:
     name: str
     increased_stat: Optional[str]
@@ -13,3 +15,50 @@ class Nature:
         elif stat == self.decreased_stat:
             return 0.9
         return 1.0
+
+# 性格は一度だけ読み込んで共有し、ポケモンは性格の番号だけを持つ。
+# 補正は [性格番号][ステータス番号] で引ける 25×6 の表にしておく
+class NatureTable:
+    _natures: ClassVar[Optional[Tuple[Nature, ...]]] = None
+    _ids: ClassVar[Dict[str, int]] = {}
+    _multipliers: ClassVar[Tuple[Tuple[float, ...], ...]] = ()
+
+    @classmethod
+    def load(cls) -> Tuple[Nature, ...]:
+        if cls._natures is None:
+            natures = tuple(Nature(**data) for data in Config.NATURES)
+            cls._ids = {nature.name: i for i, nature in enumerate(natures)}
+            cls._multipliers = tuple(tuple(nature.get_multiplier(stat) for stat in STAT_KEYS)
+                                     for nature in natures)
+            cls._natures = natures
+        return cls._natures
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._natures = None
+
+    @classmethod
+    def count(cls) -> int:
+        return len(cls.load())
+
+    @classmethod
+    def get(cls, nature_id: int) -> Nature:
+        return cls.load()[nature_id]
+
+    @classmethod
+    def id_of(cls, name: str) -> int:
+        cls.load()
+        try:
+            return cls._ids[name]
+        except KeyError:
+            raise ValueError(f"{name} という性格はありません。") from None
+
+    @classmethod
+    def multipliers(cls) -> Tuple[Tuple[float, ...], ...]:
+        cls.load()
+        return cls._multipliers
+
+    @classmethod
+    def as_array(cls):
+        import numpy as np
+        return np.asarray(cls.multipliers(), dtype=np.float64)
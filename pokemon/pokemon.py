@@ -1,152 +1,319 @@
+import os
 import random
-from typing import Dict, List, Union
-from .nature import Nature
-from .move import Move
-from .exp_strategy import ExpStrategy, Exp600k, Exp800k, Exp1000k, Exp1050k, Exp1250k, Exp1640k
-from .config import Config
+from array import array
+from itertools import repeat
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+from .nature import Nature, NatureTable
+from .move import MoveSet, MoveSpec
+from .exp_strategy import ExpStrategy
+from .learnset import Learnset
+from .events import (CONSOLE_SINK, EventSink, ExpGained, LevelUp, MoveLearned, MoveLearnPending,
+                     MoveNotLearned, MovePolicy, StatDelta, default_policy)
+from .locks import synchronized
+from .species import Species
+from .stats import STAT_CACHE, STAT_INDEX, STAT_KEYS, STAT_NAMES, HP, StatValues, StatView, stat_array
 
 
+# 種族データとまだ照合していない個体の世代 (Species.generation は 0 以上)
+UNSYNCED = -1
+
 # ポケモン
 class Pokemon:
-    def __init__(self, name: str, types: Union[str, List[str]], base_stats: Dict[str, int], 
-                 level_up_moves: Dict[int, List[str]], exp_strategy: ExpStrategy, level: int = 1):
+    # 大量の個体を保持するため、インスタンス辞書を持たない
+    __slots__ = ('name', '_nature_id', 'types', '_base_stats', '_level', '_ivs', '_evs', '_stats',
+                 '_stats_dirty', 'moves', '_learnset', 'exp_strategy', 'exp', '_generation')
+
+    stat_names = STAT_NAMES
+
+    def __init__(self, name: str, types: Union[str, List[str]], base_stats: Mapping[str, int], 
+                 level_up_moves: Union[Dict[int, List[str]], Learnset], exp_strategy: ExpStrategy, level: int = 1,
+                 rng: Optional[random.Random] = None):
+        rng = rng or random
+        self._stats_dirty = True
         self.name = name
-        self.nature = Nature(**random.choice(Config.NATURES))
-        self.types = types if isinstance(types, list) else [types]
-        self.base_stats = base_stats
-        self.stat_names = {
-            'hp': 'HP', 'attack': 'こうげき', 'defense': 'ぼうぎょ',
-            'sp_attack': 'とくこう', 'sp_defense': 'とくぼう', 'speed': 'すばやさ'
-        }
+        self._nature_id = rng.randrange(NatureTable.count())
+        self.types = tuple(types) if isinstance(types, (list, tuple)) else (types,)
+        # 種族値の配列は種族ごとに共有する
+        self._base_stats = base_stats if isinstance(base_stats, (array, memoryview)) else stat_array(base_stats)
+        # 種族の共有データ (読み取り専用の種族値) から作られた個体だけ、データの再読み込みに追従する。
+        # 受け取った種族値が作られた世代はわからないので、最初の calculate_stats で最新の種族と照合させる
+        self._generation = UNSYNCED if isinstance(base_stats, memoryview) else None
         self.level = level
-        self.ivs = {stat: random.randint(0, 31) for stat in base_stats}
-        self.evs = {stat: 0 for stat in base_stats}
-        self.stats = {stat: 0 for stat in base_stats}
-        self.moves: List[Move] = []
-        self.level_up_moves = level_up_moves
+        self._ivs = array('H', [rng.randint(0, 31) for _ in STAT_KEYS])
+        self._evs = stat_array()
+        self._stats = stat_array()
+        self.moves = MoveSet()
+        # 種族ごとの Learnset を渡せば共有される
+        self._learnset = level_up_moves if isinstance(level_up_moves, Learnset) else Learnset(level_up_moves)
         self.exp_strategy = exp_strategy
         self.exp = 0
         
         self.set_level(level)
         self.calculate_stats()
 
+    def __getstate__(self):
+        # 種族で共有する種族値 (読み取り専用の memoryview) は pickle できないので配列にして渡す
+        state = {name: getattr(self, name) for name in Pokemon.__slots__ if hasattr(self, name)}
+        state['_base_stats'] = array('H', self._base_stats)
+        return None, state
+
+    @property
+    def level_up_moves(self) -> Mapping[int, Tuple[str, ...]]:
+        # 種族で共有する Learnset の読み取り専用のビュー
+        return self._learnset.level_up_moves
+
+    @level_up_moves.setter
+    def level_up_moves(self, level_up_moves: Dict[int, List[str]]) -> None:
+        self._learnset = Learnset(level_up_moves)
+
+    # ステータスの計算に使う値が変わったら再計算が必要な状態にする
+    @property
+    def level(self) -> int:
+        return self._level
+
+    @level.setter
+    def level(self, level: int) -> None:
+        self._level = level
+        self._stats_dirty = True
+
+    @property
+    def nature(self) -> Nature:
+        return NatureTable.get(self._nature_id)
+
+    @nature.setter
+    def nature(self, nature: Union[Nature, str]) -> None:
+        self._nature_id = NatureTable.id_of(nature if isinstance(nature, str) else nature.name)
+        self._stats_dirty = True
+
+    @property
+    def nature_id(self) -> int:
+        return self._nature_id
+
+    @property
+    def base_stats(self) -> StatView:
+        return StatView(self._base_stats, self, '_base_stats')
+
+    @property
+    def ivs(self) -> StatView:
+        return StatView(self._ivs, self, '_ivs')
+
+    @ivs.setter
+    def ivs(self, ivs: Mapping[str, int]) -> None:
+        self._ivs = stat_array(ivs)
+        self._stats_dirty = True
+
+    @property
+    def evs(self) -> StatView:
+        return StatView(self._evs, self, '_evs')
+
+    @evs.setter
+    def evs(self, evs: Mapping[str, int]) -> None:
+        self._evs = stat_array(evs)
+        self._stats_dirty = True
+
+    @property
+    def stats(self) -> StatView:
+        return StatView(self._stats, self, '_stats')
+
+    # 複数スレッドから呼ばれても、他のスレッドが途中の値を読まないように
+    # 新しい配列を作ってから差し替える
+    @synchronized
     def set_ivs(self, ivs: Dict[str, int]) -> None:
-        self.ivs.update(ivs)
+        self._ivs = self._updated(self._ivs, ivs)
+        self._stats_dirty = True
         self.calculate_stats()
 
+    @synchronized
     def set_evs(self, evs: Dict[str, int]) -> None:
-        self.evs.update(evs)
+        self._evs = self._updated(self._evs, evs)
+        self._stats_dirty = True
         self.calculate_stats()
 
+    @staticmethod
+    def _updated(values: StatValues, updates: Mapping[str, int]) -> array:
+        values = array('H', values)
+        for stat, value in updates.items():
+            values[STAT_INDEX[stat]] = value
+        return values
+
+    @synchronized
+    def _replace_stat(self, field: str, index: int, value: int) -> array:
+        # StatView からの書き換え。配列はその場で変えずに複製して差し替える
+        values = array('H', getattr(self, field))
+        values[index] = value
+        setattr(self, field, values)
+        if field == '_base_stats':
+            # 種族で共有している種族値から切り離したので、データの再読み込みには追従しない
+            self._generation = None
+        self._stats_dirty = True
+        return values
+
+    @synchronized
     def set_level(self, level: int) -> None:
-        while self.level < level:
-            self.level_up(initial_setup=True)
+        # 1レベルずつ上げずに、レベル・経験値・わざを直接決める
+        if self.level < level:
+            self.level = level
+        min_exp = self.exp_strategy.exp_for_level(min(self.level, self.exp_strategy.MAX_LEVEL))
+        if self.exp < min_exp:
+            self.exp = min_exp
         self.calculate_stats()
         self.initialize_moves()
 
+    @synchronized
     def calculate_stats(self) -> None:
-        for stat, base in self.base_stats.items():
-            if stat == 'hp':
-                self.stats[stat] = self._calculate_hp(base)
+        generation = self._generation
+        if generation is not None and generation != Species.generation:
+            self._sync_species()
+        # 前回の計算から何も変わっていなければ何もしない
+        if not self._stats_dirty:
+            return
+        # 印を消してから値を読む。読んだ後にロックなしの代入 (p.level = ... など) で値が変わっても
+        # 印が付け直されるので、次の呼び出しで計算し直される
+        self._stats_dirty = False
+        # キャッシュのキーとすべてのステータスを、一度だけ読んだ同じ値から求める
+        base_stats, level, ivs, evs, nature_id = (self._base_stats, self._level, self._ivs, self._evs,
+                                                  self._nature_id)
+        try:
+            key = (base_stats.tobytes(), level, ivs.tobytes(), evs.tobytes(), nature_id)
+            cached = STAT_CACHE.get(key)
+            if cached is not None:
+                stats = array('H', cached)
             else:
-                self.stats[stat] = self._calculate_other_stat(stat, base)
+                multipliers = NatureTable.multipliers()[nature_id]
+                stats = stat_array()
+                for i in range(len(STAT_KEYS)):
+                    if i == HP:
+                        stats[i] = self._calculate_hp(base_stats[i], ivs[i], evs[i], level)
+                    else:
+                        stats[i] = self._calculate_other_stat(base_stats[i], ivs[i], evs[i], level, multipliers[i])
+                STAT_CACHE.put(key, stats.tobytes())
+            # 計算し終えた配列に差し替えるので、読み手が途中の値を見ることはない
+            self._stats = stats
+        except BaseException:
+            self._stats_dirty = True
+            raise
+
+    def _sync_species(self) -> None:
+        # 種族データが再読み込みされていたら、最新の種族値・タイプ・わざを参照し直す
+        generation = Species.generation
+        try:
+            species = Species.get(self.name)
+        except ValueError:
+            # 種族が削除されたときは今のデータのまま使う
+            species = None
+        if species is not None and species.base_stats is not self._base_stats:
+            self._base_stats = species.base_stats
+            self.types = species.types
+            self._learnset = species.learnset
+        # 性格補正が変わった場合もあるので、ステータスは計算し直す
+        self._stats_dirty = True
+        self._generation = generation
 
-    def _calculate_hp(self, base: int) -> int:
-        return int((2 * base + self.ivs['hp'] + self.evs['hp'] // 4) * self.level / 100) + self.level + 10
+    @staticmethod
+    def stat_cache_info() -> Dict[str, int]:
+        return STAT_CACHE.info()
+
+    @staticmethod
+    def _calculate_hp(base: int, iv: int, ev: int, level: int) -> int:
+        return int((2 * base + iv + ev // 4) * level / 100) + level + 10
 
-    def _calculate_other_stat(self, stat: str, base: int) -> int:
-        value = int(((2 * base + self.ivs[stat] + self.evs[stat] // 4) * self.level / 100) + 5)
-        return int(value * self.nature.get_multiplier(stat))
+    @staticmethod
+    def _calculate_other_stat(base: int, iv: int, ev: int, level: int, multiplier: float) -> int:
+        value = int(((2 * base + iv + ev // 4) * level / 100) + 5)
+        return int(value * multiplier)
 
-    def learn_move(self, new_move_name: str) -> None:
+    @synchronized
+    def learn_move(self, new_move_name: str, sink: Optional[EventSink] = None,
+                   policy: Optional[MovePolicy] = None) -> None:
+        sink = CONSOLE_SINK if sink is None else sink
         if len(self.moves) < 4:
             self._add_move(new_move_name)
-            print(f"{self.name}は{new_move_name}をおぼえた!")
+            sink(MoveLearned(self.name, new_move_name))
         else:
-            self._handle_move_learning(new_move_name)
+            self._handle_move_learning(new_move_name, sink, default_policy(sink) if policy is None else policy)
 
     def _add_move(self, move_name: str) -> None:
-        move_data = Config.MOVES_DATA[move_name]
-        new_move = Move(
-            name=move_name,
-            type=move_data['type'],
-            power=move_data['power'],
-            accuracy=move_data['accuracy'],
-            pp=move_data['pp'],
-            max_pp=move_data['pp'], 
-            category=move_data['category']
-        )
+        spec = MoveSpec.get(move_name)
         if len(self.moves) < 4:
-            self.moves.append(new_move)
+            self.moves.append(spec)
 
-    def _handle_move_learning(self, new_move_name: str) -> None:
-        print(f"{self.name}は新しく{new_move_name}を覚えようとしている！")
-        print(f"{self.name}はすでに４つのわざをおぼえています。わすれさせるわざを選んでください。")
-        for i, move in enumerate(self.moves):
-            print(f"{i+1}: {move.name}")
-        print(f"5: {new_move_name}をおぼえるのをやめる")
-        print("\n")
+    def _handle_move_learning(self, new_move_name: str, sink: EventSink, policy: MovePolicy) -> None:
+        sink(MoveLearnPending(self.name, new_move_name, tuple(move.name for move in self.moves)))
+        choice = policy(self, new_move_name)
 
-        print("どのわざをわすれさせますか？")
-        try:
-            choice = int(input("わすれさせるわざのばんごうをえらんでください。"))
-        except ValueError:
-            print("ばんごうがまちがっています。わざをおぼえなかった")
-            return
-
-        if 1 <= choice <= 4:
-            forgotten_move = self.moves[choice-1].name
-            self.moves[choice-1] = Move(name=new_move_name, **Config.MOVES_DATA[new_move_name])
-            print(f"{self.name}は{forgotten_move}をわすれて{new_move_name}をおぼえました!")
-        elif choice == 5:
-            print(f"{self.name}は{new_move_name}をおぼえなかった")
+        if choice is None:
+            sink(MoveNotLearned(self.name, new_move_name))
+        elif 0 <= choice < 4:
+            forgotten_move = self.moves[choice].name
+            self.moves[choice] = MoveSpec.get(new_move_name)
+            sink(MoveLearned(self.name, new_move_name, forgotten=forgotten_move))
         else:
-            print("ばんごうがまちがっています。わざをおぼえなかった")
+            sink(MoveNotLearned(self.name, new_move_name, invalid_choice=True))
 
-    def gain_exp(self, amount: int) -> None:
+    @synchronized
+    def gain_exp(self, amount: int, sink: Optional[EventSink] = None,
+                 policy: Optional[MovePolicy] = None, batched: bool = False) -> None:
+        # sink にイベントを送り、わざの入れ替えは policy に任せる (省略時は従来どおりコンソール)
+        sink = CONSOLE_SINK if sink is None else sink
         self.exp += amount
-        print(f"{self.name}は{amount}のけいけんちをもらった！")
+        sink(ExpGained(self.name, amount))
         
-        while self.exp >= self.exp_to_next_level():
-            initial_level = self.level
-            self.level_up()
-            if self.level > initial_level + 1:
-                print(f"{self.name}は\nレベル{self.level}にあがった！")
+        # 到達レベルは累計経験値テーブルから一度で求める
+        target_level = self.exp_strategy.level_for_exp(self.exp)
+        if batched:
+            # 何レベル上がってもステータスの再計算は1回だけにする
+            if self.level < target_level:
+                self._jump_to_level(target_level, sink, policy)
+            return
+        while self.level < target_level:
+            self.level_up(sink=sink, policy=policy)
+
+    def _jump_to_level(self, level: int, sink: EventSink, policy: Optional[MovePolicy],
+                       stats: Optional[Sequence[int]] = None) -> None:
+        old_level = self.level
+        old_stats = self._stats.tolist()
+        self.level = level
+        if stats is None:
+            self.calculate_stats()
+        else:
+            self._stats = array('H', stats)
+            self._stats_dirty = False
+        deltas = tuple(StatDelta(stat, old, new) for stat, old, new in zip(STAT_KEYS, old_stats, self._stats))
+        sink(LevelUp(self.name, self.level, deltas))
+        for move in self._learnset.moves_between(old_level, level):
+            self.learn_move(move, sink, policy)
 
-    def level_up(self, initial_setup: bool = False) -> None:
+    @synchronized
+    def level_up(self, initial_setup: bool = False, sink: Optional[EventSink] = None,
+                 policy: Optional[MovePolicy] = None) -> None:
+        sink = CONSOLE_SINK if sink is None else sink
         self.level += 1
         if not initial_setup:
-            self._display_level_up_info()
-        self._learn_new_moves(initial_setup)
+            self._display_level_up_info(sink)
+        self._learn_new_moves(initial_setup, sink, policy)
 
-    def _display_level_up_info(self) -> None:
-        print(f"{self.name}は\nレベル{self.level}にあがった！")
-        old_stats = self.stats.copy()
+    def _display_level_up_info(self, sink: EventSink) -> None:
+        old_stats = self._stats.tolist()
         self.calculate_stats()
-        for stat, new_value in self.stats.items():
-            increase = new_value - old_stats[stat]
-            if increase > 0:
-                print(f"{self.stat_names[stat]}が{increase}あがった！")
-        print("\n")
-
-    def _learn_new_moves(self, initial_setup: bool) -> None:
-        if self.level in self.level_up_moves:
-            for move in self.level_up_moves[self.level]:
-                if initial_setup:
-                    self._add_move(move)
-                else:
-                    self.learn_move(move)
+        deltas = tuple(StatDelta(stat, old, new) for stat, old, new in zip(STAT_KEYS, old_stats, self._stats))
+        sink(LevelUp(self.name, self.level, deltas))
+
+    def _learn_new_moves(self, initial_setup: bool, sink: Optional[EventSink] = None,
+                         policy: Optional[MovePolicy] = None) -> None:
+        for move in self._learnset.moves_at(self.level):
+            if initial_setup:
+                self._add_move(move)
+            else:
+                self.learn_move(move, sink, policy)
 
     def initialize_moves(self) -> None:
-        all_moves = [move for level, moves in self.level_up_moves.items() 
-                     for move in moves if level <= self.level]
-        final_moves = all_moves[-4:] if len(all_moves) >= 4 else all_moves
-        self.moves = []
-        for move in final_moves:
+        # 種族の Learnset (LearnsetIndex と共有) はレベル順なので、末尾の4つを取るだけでよい
+        self.moves.clear()
+        for move in self._learnset.last_moves(self.level, 4):
             self._add_move(move)
 
     def exp_to_next_level(self) -> int:
-        return self.exp_strategy.calculate_exp(self.level + 1)
+        return self.exp_strategy.exp_for_level(self.level + 1)
 
     def __str__(self) -> str:
         stats_str = '\n'.join([f"{self.stat_names[stat]}: {value}" for stat, value in self.stats.items()])
@@ -158,27 +325,73 @@ class Pokemon:
                 f"おぼえているわざ : {', '.join(move_names)}")
 
     @staticmethod
-    def create_pokemon(name: str, level: int = 5) -> 'Pokemon':
-        if name not in Config.POKEMON_DATA:
-            raise ValueError(f"{name} というポケモンはデータベースにありません。")
-        
-        data = Config.POKEMON_DATA[name]
-        exp_growth = data["exp_growth"]
-        exp_strategy: ExpStrategy
-
-        if exp_growth == '600k':
-            exp_strategy = Exp600k()
-        elif exp_growth == '800k':
-            exp_strategy = Exp800k()
-        elif exp_growth == '1000k':
-            exp_strategy = Exp1000k()
-        elif exp_growth == '1050k':
-            exp_strategy = Exp1050k()
-        elif exp_growth == '1250k':
-            exp_strategy = Exp1250k()
-        elif exp_growth == '1640k':
-            exp_strategy = Exp1640k()
-        else:
-            raise ValueError(f"不正な経験値成長率です: {exp_growth}")
-        
-        return Pokemon(name, data['type'], data['base_stats'], data['level_up_moves'], exp_strategy, level=level)
+    def create_pokemon(name: str, level: int = 5, rng: Optional[random.Random] = None) -> 'Pokemon':
+        species = Species.get(name)
+        return Pokemon(name, species.types, species.base_stats, species.learnset,
+                       species.exp_strategy, level=level, rng=rng)
+
+    @staticmethod
+    def create_many(specs: Iterable[Union[str, Tuple[str, int]]], seed: Optional[int] = None,
+                    workers: int = 1) -> List['Pokemon']:
+        # specs は ポケモン名 または (ポケモン名, レベル) の並び
+        specs = [(spec, 5) if isinstance(spec, str) else tuple(spec) for spec in specs]
+        if seed is None:
+            seed = random.getrandbits(64)
+
+        # 乱数列はワーカーではなくチャンクごとに割り当てるため、
+        # 同じ seed ならワーカー数に関係なく同じ結果になる
+        chunks = [specs[i:i + CREATE_CHUNK_SIZE] for i in range(0, len(specs), CREATE_CHUNK_SIZE)]
+        if workers <= 1 or len(chunks) <= 1:
+            return [pokemon for i, chunk in enumerate(chunks) for pokemon in _create_chunk(seed, i, chunk)]
+
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_create_chunk, repeat(seed), range(len(chunks)), chunks)
+            roster = [pokemon for chunk in results for pokemon in chunk]
+        # プロセス間でコピーされた種族データを共有インスタンスに戻す
+        generation = Species.generation
+        for pokemon in roster:
+            species = Species.get(pokemon.name)
+            pokemon.types = species.types
+            pokemon._base_stats = species.base_stats
+            pokemon._learnset = species.learnset
+            pokemon._generation = generation
+        return roster
+
+    @classmethod
+    def restore(cls, name: str, level: int, exp: int, nature_id: int, ivs: Sequence[int],
+                evs: Sequence[int], moves: Sequence[Tuple[str, int]]) -> 'Pokemon':
+        # 保存しておいた状態から、乱数もレベルアップ処理も使わずに復元する
+        # 世代は種族を取り出す前に読む (間で入れ替わっても次の calculate_stats で照合し直される)
+        generation = Species.generation
+        species = Species.get(name)
+        pokemon = cls.__new__(cls)
+        pokemon.name = name
+        pokemon.types = species.types
+        pokemon._base_stats = species.base_stats
+        pokemon._learnset = species.learnset
+        pokemon.exp_strategy = species.exp_strategy
+        pokemon._generation = generation
+        pokemon._level = level
+        pokemon.exp = exp
+        pokemon._nature_id = nature_id
+        pokemon._ivs = array('H', ivs)
+        pokemon._evs = array('H', evs)
+        pokemon._stats = stat_array()
+        pokemon._stats_dirty = True
+        pokemon.moves = MoveSet()
+        for move_name, pp in moves:
+            pokemon.moves.append(move_name, pp)
+        pokemon.calculate_stats()
+        return pokemon
+
+CREATE_CHUNK_SIZE = 1024
+
+def _create_chunk(seed: int, index: int, specs: Sequence[Tuple[str, int]]) -> List[Pokemon]:
+    rng = random.Random(f"{seed}:{index}")
+    return [Pokemon.create_pokemon(name, level, rng=rng) for name, level in specs]
+
+# POKEMON_INSTRUMENT が設定されていれば計測フックを有効にする
+if os.environ.get('POKEMON_INSTRUMENT'):
+    from .instrumentation import enable
+    enable()
@@ -0,0 +1,182 @@
+"""データファイルを監視し、変更されたファイルだけを読み込み直す
+
+    reloader = DataReloader(interval=1.0)
+    reloader.start()   # バックグラウンドで os.stat をポーリングする
+
+変更されたファイルだけを解析し、種族・わざ単位で差分を取ってから Config のデータを
+まとめて差し替える。差し替え後は変更された種族・わざのキャッシュだけを捨てる。
+生きている Pokemon は、次の calculate_stats で新しい種族値を参照する。
+Config.use_store で読んでいる種族・わざは再読み込みしない。個体は性格を番号で持つので、
+既存の性格の並び順を変える・削除する変更も反映しない (末尾への追加と補正の変更は反映する)。
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from .config import Config, _freeze
+from .data_loader import LazyDict
+from .move import MoveSpec
+from .nature import NatureTable
+from .species import Species
+from .stats import STAT_CACHE
+from .type_chart import TypeChart
+
+logger = logging.getLogger(__name__)
+
+# 監視するファイルと Config の属性名
+FILES = {
+    'pokemon_data.yml': 'POKEMON_DATA',
+    'moves_data.yml': 'MOVES_DATA',
+    'natures.yml': 'NATURES',
+    'type_chart.yml': 'TYPE_CHART',
+}
+
+
+class ReloadRejected(ValueError):
+    """読み込み直すと生きている個体のデータが食い違うので、反映しなかった変更"""
+
+
+@dataclass(frozen=True)
+class ReloadResult:
+    filename: str
+    added: Tuple[Any, ...]
+    changed: Tuple[Any, ...]
+    removed: Tuple[Any, ...]
+    seconds: float
+
+    @property
+    def entries(self) -> int:
+        return len(self.added) + len(self.changed) + len(self.removed)
+
+
+def diff_entries(old: Any, new: Any) -> Tuple[Tuple[Any, ...], Tuple[Any, ...], Tuple[Any, ...]]:
+    """(追加, 変更, 削除) されたキーを返す。dict 以外のデータは全体を1つの要素として比べる"""
+    if not isinstance(old, Mapping) or not isinstance(new, Mapping):
+        return (), (() if old == new else (None,)), ()
+    added = tuple(key for key in new if key not in old)
+    removed = tuple(key for key in old if key not in new)
+    if isinstance(old, LazyDict) and isinstance(new, LazyDict):
+        # marshal したバイト列が同じなら復元せずに同じとみなす
+        changed = tuple(key for key in new if key in old
+                        and old.blob(key) != new.blob(key) and old[key] != new[key])
+    else:
+        changed = tuple(key for key in new if key in old and old[key] != new[key])
+    return added, changed, removed
+
+
+def check_nature_order(old: Any, new: Any) -> None:
+    """個体は性格を番号で持つので、既存の性格の並び順を変える・削除する変更は受け付けない"""
+    old_names = [nature['name'] for nature in old]
+    new_names = [nature['name'] for nature in new]
+    if new_names[:len(old_names)] != old_names:
+        raise ReloadRejected("性格の並び順を変えたり削除したりすると、生きている個体の性格が変わってしまいます。"
+                             "性格は末尾に追加してください。")
+
+
+class DataReloader:
+    def __init__(self, interval: float = 1.0, files: Optional[Mapping[str, str]] = None):
+        self.interval = interval
+        self.files = dict(FILES if files is None else files)
+        self._stats: Dict[str, Optional[Tuple[int, int]]] = {name: self._stat(name) for name in self.files}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.history: List[ReloadResult] = []
+
+    @staticmethod
+    def _stat(filename: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(os.path.join(Config.DATA_DIR, filename))
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self) -> List[ReloadResult]:
+        """すべてのファイルを一度ずつ確認し、変更されたものを読み込み直す"""
+        results = []
+        for filename in self.files:
+            stat = self._stat(filename)
+            if stat is None or stat == self._stats.get(filename):
+                continue
+            # 読み込みに失敗したときは例外になり、次のポーリングでもう一度試す
+            try:
+                result = self.reload(filename)
+            except ReloadRejected as error:
+                # 反映できない変更は、ファイルがもう一度変わるまで読み直さない
+                logger.error("%s の変更を反映しませんでした: %s", filename, error)
+                result = None
+            self._stats[filename] = stat
+            if result is not None:
+                results.append(result)
+        return results
+
+    def reload(self, filename: str) -> Optional[ReloadResult]:
+        attr = self.files[filename]
+        start = time.perf_counter()
+        old = Config.loaded_data(attr)
+        if old is None:
+            # まだ読み込まれていなければ、次に参照されたときに新しいファイルが読まれる
+            return None
+        if Config.store_backed(attr):
+            # use_store で読んでいるデータは YAML の変更で置き換えない
+            logger.info("%s はデータストアから読んでいるので、再読み込みしません。", filename)
+            return None
+        new = _freeze(Config.load_data(filename, lazy=Config.LAZY_ENTRIES))
+        if attr == 'NATURES':
+            check_nature_order(old, new)
+        added, changed, removed = diff_entries(old, new)
+        if added or changed or removed:
+            with Config._lock:
+                if Config.store_backed(attr):
+                    return None
+                setattr(Config, attr, new)
+                self._invalidate(attr, changed + removed)
+        result = ReloadResult(filename, added, changed, removed, time.perf_counter() - start)
+        self.history.append(result)
+        logger.info("%s を再読み込みしました: 追加 %d, 変更 %d, 削除 %d (%.1f ms)",
+                    filename, len(added), len(changed), len(removed), result.seconds * 1000)
+        return result
+
+    @staticmethod
+    def _invalidate(attr: str, keys: Tuple[Any, ...]) -> None:
+        if attr == 'POKEMON_DATA':
+            Species.invalidate(keys)
+        elif attr == 'MOVES_DATA':
+            MoveSpec.invalidate(keys)
+        elif attr == 'NATURES':
+            NatureTable.clear_cache()
+            # 性格補正が変わると計算済みのステータスも使えない
+            STAT_CACHE.clear()
+            # 世代を進めて、生きている個体にステータスを計算し直させる
+            Species.invalidate(())
+        elif attr == 'TYPE_CHART':
+            TypeChart.clear_cache()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("データの再読み込みに失敗しました。")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='pokemon-data-reloader', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> 'DataReloader':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,162 @@
+"""ボックスのポケモンを固定長レコードのバイナリ形式で読み書きする
+
+ファイル構成:
+    ヘッダ (マジック, バージョン, レコード長)
+    種族名・わざ名・性格名の一覧 (レコード内の番号との対応表)
+    レコード x N
+
+1体あたりのレコード:
+    種族番号 H, レベル B, 性格番号 B, 経験値 I, 個体値 I (5ビット x 6),
+    努力値 6B, わざ番号 4H (空きは 0xFFFF), PP 4B
+
+読み書きはどちらもジェネレーターで1体ずつ処理するため、件数によらず一定のメモリで動く。
+デバッグ用に同じ内容を JSON Lines でも読み書きできる。
+"""
+import json
+import struct
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, TextIO, Tuple
+from .config import Config
+from .nature import NatureTable
+from .pokemon import Pokemon
+from .stats import STAT_KEYS
+
+MAGIC = b'PKRS'
+VERSION = 1
+HEADER = struct.Struct('<4sHH')
+RECORD = struct.Struct('<HBBII6B4H4B')
+EMPTY_MOVE = 0xFFFF
+IV_BITS = 5
+MAX_MOVES = 4
+# 一度に読み込むレコード数
+READ_CHUNK = 4096
+
+
+class RosterRecord(NamedTuple):
+    name: str
+    level: int
+    exp: int
+    nature_id: int
+    ivs: Tuple[int, ...]
+    evs: Tuple[int, ...]
+    moves: Tuple[Tuple[str, int], ...]
+
+    def to_pokemon(self) -> Pokemon:
+        return Pokemon.restore(self.name, self.level, self.exp, self.nature_id, self.ivs, self.evs, self.moves)
+
+
+def pack_ivs(ivs: Iterable[int]) -> int:
+    packed = 0
+    for i, iv in enumerate(ivs):
+        packed |= (iv & 0x1F) << (IV_BITS * i)
+    return packed
+
+def unpack_ivs(packed: int) -> Tuple[int, ...]:
+    return tuple((packed >> (IV_BITS * i)) & 0x1F for i in range(len(STAT_KEYS)))
+
+
+def _write_names(file: BinaryIO, names: List[str]) -> None:
+    file.write(struct.pack('<I', len(names)))
+    for name in names:
+        encoded = name.encode('utf-8')
+        file.write(struct.pack('<H', len(encoded)))
+        file.write(encoded)
+
+def _read_exact(file: BinaryIO, size: int) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError("ロスターファイルが途中で終わっています。")
+    return data
+
+def _read_names(file: BinaryIO) -> List[str]:
+    count, = struct.unpack('<I', _read_exact(file, 4))
+    names = []
+    for _ in range(count):
+        length, = struct.unpack('<H', _read_exact(file, 2))
+        names.append(_read_exact(file, length).decode('utf-8'))
+    return names
+
+
+def write_roster(file: BinaryIO, roster: Iterable[Pokemon]) -> int:
+    """roster をバイナリ形式で書き出し、書いた件数を返す"""
+    species_names = list(Config.POKEMON_DATA)
+    move_names = list(Config.MOVES_DATA)
+    species_ids = {name: i for i, name in enumerate(species_names)}
+    move_ids = {name: i for i, name in enumerate(move_names)}
+
+    file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+    _write_names(file, species_names)
+    _write_names(file, move_names)
+    _write_names(file, [nature.name for nature in NatureTable.load()])
+
+    count = 0
+    for pokemon in roster:
+        moves = [(move_ids[move.name], move.pp) for move in pokemon.moves]
+        moves += [(EMPTY_MOVE, 0)] * (MAX_MOVES - len(moves))
+        file.write(RECORD.pack(
+            species_ids[pokemon.name], pokemon.level, pokemon.nature_id, pokemon.exp,
+            pack_ivs(pokemon._ivs), *pokemon._evs,
+            *(move_id for move_id, _ in moves), *(pp for _, pp in moves)))
+        count += 1
+    return count
+
+
+def read_records(file: BinaryIO) -> Iterator[RosterRecord]:
+    """Pokemon を作らずに、レコードを軽量なタプルとして1件ずつ返す"""
+    magic, version, record_size = HEADER.unpack(_read_exact(file, HEADER.size))
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError("ロスターファイルの形式が正しくありません。")
+    species_names = _read_names(file)
+    move_names = _read_names(file)
+    # ファイルを書いたときの性格番号を、現在の番号に読み替える
+    nature_ids = [NatureTable.id_of(name) for name in _read_names(file)]
+
+    while True:
+        chunk = file.read(RECORD.size * READ_CHUNK)
+        if not chunk:
+            return
+        if len(chunk) % RECORD.size:
+            raise ValueError("ロスターファイルが途中で終わっています。")
+        for record in RECORD.iter_unpack(chunk):
+            species_id, level, nature_id, exp, ivs = record[:5]
+            move_ids = record[11:15]
+            pps = record[15:19]
+            yield RosterRecord(
+                species_names[species_id], level, exp, nature_ids[nature_id], unpack_ivs(ivs), record[5:11],
+                tuple((move_names[move_id], pp) for move_id, pp in zip(move_ids, pps) if move_id != EMPTY_MOVE))
+
+
+def read_roster(file: BinaryIO) -> Iterator[Pokemon]:
+    for record in read_records(file):
+        yield record.to_pokemon()
+
+
+def to_dict(pokemon: Pokemon) -> Dict:
+    return {
+        'name': pokemon.name,
+        'level': pokemon.level,
+        'exp': pokemon.exp,
+        'nature': pokemon.nature.name,
+        'ivs': dict(pokemon.ivs),
+        'evs': dict(pokemon.evs),
+        'moves': [{'name': move.name, 'pp': move.pp} for move in pokemon.moves],
+    }
+
+def from_dict(data: Dict) -> Pokemon:
+    return Pokemon.restore(
+        data['name'], data['level'], data['exp'], NatureTable.id_of(data['nature']),
+        [data['ivs'][stat] for stat in STAT_KEYS], [data['evs'][stat] for stat in STAT_KEYS],
+        [(move['name'], move['pp']) for move in data['moves']])
+
+
+def write_jsonl(file: TextIO, roster: Iterable[Pokemon]) -> int:
+    count = 0
+    for pokemon in roster:
+        file.write(json.dumps(to_dict(pokemon), ensure_ascii=False))
+        file.write('\n')
+        count += 1
+    return count
+
+def read_jsonl(file: TextIO) -> Iterator[Pokemon]:
+    for line in file:
+        if line.strip():
+            yield from_dict(json.loads(line))
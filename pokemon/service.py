@@ -0,0 +1,378 @@
+"""ポケモンの生成・ステータス計算・経験値付与を提供する asyncio サーバー
+
+    python -m pokemon.service [--host 127.0.0.1] [--port 8765 | --unix パス]
+
+1行に1つの JSON でリクエストを送ると、同じ id を付けたレスポンスが1行で返る。
+レスポンスの順番はリクエストの順番と一致するとは限らない。
+
+    {"id": 1, "op": "create", "name": "ピカチュウ", "level": 50}
+    {"id": 2, "op": "stats", "handle": 1}
+    {"id": 3, "op": "stats", "name": "ピカチュウ", "level": 50, "nature": "ようき", "ivs": {...}, "evs": {...}}
+    {"id": 4, "op": "gain_exp", "handle": 1, "amount": 5000}
+    {"id": 5, "op": "release", "handle": 1}
+
+同時に届いたリクエストはまとめて1つのバッチとして処理する (numpy があればベクトル化する)。
+待ち行列がいっぱいになるか、接続ごとの処理中リクエストが上限に達すると、
+そのクライアントからの読み込みを止めて送信側を待たせる。
+"""
+import argparse
+import asyncio
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from .config import Config
+from .events import discard_events, keep_moves_policy
+from .move import MoveSpec
+from .nature import NatureTable
+from .pokemon import Pokemon
+from .species import Species
+from .stats import STAT_KEYS
+
+try:
+    from .batch import PokemonBatch, gain_exp_many
+except ImportError:
+    PokemonBatch = gain_exp_many = None
+
+MAX_BATCH = 512
+# 最初のリクエストが届いてから、同じバッチに加えるリクエストを待つ時間 (秒)
+MAX_DELAY = 0.002
+QUEUE_SIZE = 4096
+MAX_INFLIGHT = 1024
+OPERATIONS = ('create', 'stats', 'gain_exp', 'release')
+# まとめて失敗したとき1件ずつやり直してよい操作 (状態を変える前に検証を終えるか、状態を変えないもの)。
+# gain_exp は途中まで経験値を加えてから失敗しうるので、やり直すと二重に加算してしまう
+RETRY_EACH = ('create', 'stats', 'release')
+
+
+def snapshot(handle: int, pokemon: Pokemon) -> Dict[str, Any]:
+    return {
+        'handle': handle,
+        'name': pokemon.name,
+        'level': pokemon.level,
+        'exp': pokemon.exp,
+        'nature': pokemon.nature.name,
+        'stats': dict(zip(STAT_KEYS, pokemon._stats)),
+        'moves': [move.name for move in pokemon.moves],
+    }
+
+
+# ハンドルで個体を保持し、バッチ単位で処理する。
+# 常に1つのスレッドからしか呼ばれないので、ロックは持たない
+class PokemonService:
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = random.Random(seed)
+        self._pokemon: Dict[int, Pokemon] = {}
+        self._next_handle = 1
+
+    def __len__(self) -> int:
+        return len(self._pokemon)
+
+    def _get(self, request: Dict[str, Any]) -> Tuple[int, Pokemon]:
+        handle = request['handle']
+        if not isinstance(handle, int):
+            raise ValueError(f"ハンドルは整数で指定してください: {handle!r}")
+        pokemon = self._pokemon.get(handle)
+        if pokemon is None:
+            raise KeyError(f"ハンドル {handle} のポケモンはいません。")
+        return handle, pokemon
+
+    def process(self, requests: List[Dict[str, Any]]) -> List[Any]:
+        """requests を処理し、結果 (失敗したものは例外) をリクエストと同じ順番で返す"""
+        # 同じハンドルへの操作は届いた順に別の段に分け、各段の中では操作ごとにまとめて処理する
+        results: List[Any] = [None] * len(requests)
+        waves: List[Dict[str, List[int]]] = []
+        last_wave: Dict[Any, int] = {}
+        for i, request in enumerate(requests):
+            op = request.get('op')
+            # 文字列でない op (リストなど) は辞書のキーにできないこともあるので、その1件だけを失敗にする
+            if not isinstance(op, str) or op not in OPERATIONS:
+                results[i] = ValueError(f"不明な操作です: {op}")
+                continue
+            wave = 0
+            handle = request.get('handle')
+            if isinstance(handle, int):
+                wave = last_wave.get(handle, -1) + 1
+                last_wave[handle] = wave
+            if wave == len(waves):
+                waves.append({})
+            waves[wave].setdefault(op, []).append(i)
+
+        for wave in waves:
+            for op, indices in wave.items():
+                handler = getattr(self, f"_{op}_many")
+                try:
+                    outputs = handler([requests[i] for i in indices])
+                except Exception as error:
+                    if op not in RETRY_EACH:
+                        outputs = [error] * len(indices)
+                    else:
+                        # まとめて処理できなかったときは、どのリクエストが原因かを1件ずつ確かめる
+                        outputs = []
+                        for i in indices:
+                            try:
+                                outputs.extend(handler([requests[i]]))
+                            except Exception as error:
+                                outputs.append(error)
+                for i, output in zip(indices, outputs):
+                    results[i] = output
+        return results
+
+    def _create_many(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        specs = [(request['name'], int(request.get('level', 5))) for request in requests]
+        for name, level in specs:
+            Species.get(name)
+            if not 1 <= level <= 100:
+                raise ValueError(f"レベルは1から100の間で指定してください: {level}")
+        results = []
+        for pokemon in Pokemon.create_many(specs, seed=self._rng.getrandbits(64)):
+            handle = self._next_handle
+            self._next_handle += 1
+            self._pokemon[handle] = pokemon
+            results.append(snapshot(handle, pokemon))
+        return results
+
+    def _stats_many(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        specs = []
+        for i, request in enumerate(requests):
+            if 'handle' in request:
+                handle, pokemon = self._get(request)
+                pokemon.calculate_stats()
+                results[i] = {'handle': handle, 'stats': dict(zip(STAT_KEYS, pokemon._stats))}
+            else:
+                specs.append((i, request))
+        if specs:
+            for (i, _), stats in zip(specs, self._calculate_specs([request for _, request in specs])):
+                results[i] = {'stats': dict(zip(STAT_KEYS, stats))}
+        return results
+
+    @staticmethod
+    def _calculate_specs(requests: List[Dict[str, Any]]) -> List[List[int]]:
+        # 個体を作らずに、種族・レベル・性格・個体値・努力値からステータスだけを求める
+        columns = []
+        for request in requests:
+            species = Species.get(request['name'])
+            ivs = request.get('ivs', {})
+            evs = request.get('evs', {})
+            columns.append((species, int(request['level']), NatureTable.id_of(request['nature']),
+                            [int(ivs.get(stat, 0)) for stat in STAT_KEYS],
+                            [int(evs.get(stat, 0)) for stat in STAT_KEYS]))
+        if PokemonBatch is None:
+            return [Pokemon.restore(species.name, level, 0, nature_id, ivs, evs, ())._stats.tolist()
+                    for species, level, nature_id, ivs, evs in columns]
+        batch = PokemonBatch(
+            base_stats=[species.base_stats for species, *_ in columns],
+            ivs=[ivs for *_, ivs, _ in columns],
+            evs=[evs for *_, evs in columns],
+            levels=[level for _, level, *_ in columns],
+            nature_multipliers=PokemonBatch.nature_multipliers([nature_id for _, _, nature_id, *_ in columns]))
+        return batch.calculate_stats().tolist()
+
+    def _gain_exp_many(self, requests: List[Dict[str, Any]]) -> List[Any]:
+        # 経験値を加えてからでは取り消せないので、失敗しうるものは先にすべて確かめ、
+        # 不正なリクエストはその1件だけを例外で返す
+        results: List[Any] = [None] * len(requests)
+        targets = []
+        for i, request in enumerate(requests):
+            try:
+                handle, pokemon = self._get(request)
+                amount = int(request['amount'])
+                if amount < 0:
+                    raise ValueError(f"経験値は0以上で指定してください: {amount}")
+                # 上がった先で覚えるわざがデータになければ、ここで KeyError になる
+                level = pokemon.exp_strategy.level_for_exp(pokemon.exp + amount)
+                for move in pokemon._learnset.moves_between(pokemon.level, level):
+                    MoveSpec.get(move)
+            except Exception as error:
+                results[i] = error
+                continue
+            targets.append((i, handle, pokemon, amount))
+
+        # process() が同じ個体を1つのバッチに2回入れることはない
+        if gain_exp_many is None:
+            for _, _, pokemon, amount in targets:
+                pokemon.gain_exp(amount, discard_events, keep_moves_policy, batched=True)
+        elif targets:
+            gain_exp_many([pokemon for _, _, pokemon, _ in targets], [amount for *_, amount in targets],
+                          discard_events, keep_moves_policy)
+        for i, handle, pokemon, _ in targets:
+            results[i] = snapshot(handle, pokemon)
+        return results
+
+    def _release_many(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for request in requests:
+            self._get(request)
+        for request in requests:
+            self._pokemon.pop(request['handle'], None)
+        return [{'handle': request['handle']} for request in requests]
+
+
+# リクエストを待ち行列に集め、まとめて PokemonService に渡す
+class BatchProcessor:
+    def __init__(self, service: PokemonService, max_batch: int = MAX_BATCH, max_delay: float = MAX_DELAY,
+                 queue_size: int = QUEUE_SIZE):
+        self.service = service
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: 'asyncio.Queue[Tuple[Dict[str, Any], asyncio.Future]]' = asyncio.Queue(queue_size)
+        # 計算中もイベントループが接続を受け付けられるよう、処理は専用スレッドで行う
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.requests = 0
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown()
+
+    async def submit(self, request: Dict[str, Any]) -> 'asyncio.Future':
+        # 待ち行列がいっぱいなら空くまで待つ (呼び出し側の読み込みが止まる)
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        return future
+
+    async def _collect(self) -> List[Tuple[Dict[str, Any], asyncio.Future]]:
+        items = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_delay
+        while len(items) < self.max_batch:
+            if self._queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                items.append(self._queue.get_nowait())
+        return items
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            requests = [request for request, _ in items]
+            try:
+                results = await loop.run_in_executor(self._executor, self.service.process, requests)
+            except Exception as error:
+                results = [error] * len(items)
+            self.batches += 1
+            self.requests += len(items)
+            for (_, future), result in zip(items, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, KeyError) and error.args:
+        return str(error.args[0])
+    return str(error)
+
+
+class Server:
+    def __init__(self, processor: BatchProcessor, max_inflight: int = MAX_INFLIGHT):
+        self.processor = processor
+        self.max_inflight = max_inflight
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        inflight = asyncio.Semaphore(self.max_inflight)
+
+        def respond(request_id: Any, future: asyncio.Future) -> None:
+            inflight.release()
+            if writer.is_closing():
+                return
+            error = future.exception()
+            if error is None:
+                response = {'id': request_id, 'ok': True, 'result': future.result()}
+            else:
+                response = {'id': request_id, 'ok': False, 'error': _error_message(error)}
+            writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await inflight.acquire()
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("リクエストは JSON オブジェクトで送ってください。")
+                except ValueError as error:
+                    inflight.release()
+                    response = {'id': None, 'ok': False, 'error': f"リクエストを読み込めません: {error}"}
+                    writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+                    continue
+                future = await self.processor.submit(request)
+                future.add_done_callback(lambda future, request_id=request.get('id'): respond(request_id, future))
+                # クライアントがレスポンスを読まなければ、ここで読み込みを止める
+                await writer.drain()
+            # 接続が閉じられる前に、処理中のリクエストのレスポンスを返しきる
+            for _ in range(self.max_inflight):
+                await inflight.acquire()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host: str = '127.0.0.1', port: int = 8765, unix: Optional[str] = None, seed: Optional[int] = None,
+                max_batch: int = MAX_BATCH, max_delay: float = MAX_DELAY, queue_size: int = QUEUE_SIZE,
+                max_inflight: int = MAX_INFLIGHT) -> None:
+    # 最初のリクエストがデータの読み込みを待たないよう、先に読み込んでおく
+    Config.MOVES_DATA, Config.POKEMON_DATA
+    NatureTable.load()
+    processor = BatchProcessor(PokemonService(seed), max_batch, max_delay, queue_size)
+    processor.start()
+    server = Server(processor, max_inflight)
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle, unix)
+        address = unix
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        address = ':'.join(str(part) for part in listener.sockets[0].getsockname()[:2])
+    print(f"待ち受け中: {address}", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await processor.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='ポケモンの生成・ステータス計算サーバー')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help='0 なら空いているポートを使う')
+    parser.add_argument('--unix', help='TCP の代わりに使う Unix ソケットのパス')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH)
+    parser.add_argument('--max-delay', type=float, default=MAX_DELAY, help='バッチを集める時間 (秒)')
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE)
+    parser.add_argument('--max-inflight', type=int, default=MAX_INFLIGHT, help='接続ごとの処理中リクエスト数の上限')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.seed, args.max_batch, args.max_delay,
+                          args.queue_size, args.max_inflight))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
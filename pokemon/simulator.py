@@ -0,0 +1,186 @@
+"""1対1のバトルを大量に実行して勝率を見積もるシミュレーター
+
+    python -m pokemon.simulator ピカチュウ:50 ナエトル:50 [--battles N] [--workers N] [--seed N]
+
+対戦相手は「ポケモン名:レベル[:わざ1/わざ2/...]」で指定する。2体以上を指定すると総当たりになる。
+"""
+import argparse
+import random
+import time
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+from .damage import MAX_ROLL, MIN_ROLL, DamageCalculator
+from .move import MoveSet
+from .pokemon import Pokemon
+from .stats import HP, STAT_INDEX
+
+SPEED = STAT_INDEX['speed']
+ROLLS = range(MIN_ROLL, MAX_ROLL + 1)
+# 1シャードで実行するバトル数。シャードごとに乱数列を分ける
+SHARD_SIZE = 2000
+MAX_TURNS = 100
+
+
+@dataclass(frozen=True)
+class Combatant:
+    name: str
+    level: int
+    moves: Tuple[str, ...] = ()
+
+    @classmethod
+    def parse(cls, text: str) -> 'Combatant':
+        name, level, *moves = text.split(':')
+        return cls(name, int(level), tuple(moves[0].split('/')) if moves else ())
+
+    def create(self, rng: random.Random) -> Pokemon:
+        pokemon = Pokemon.create_pokemon(self.name, self.level, rng=rng)
+        if self.moves:
+            pokemon.moves = MoveSet(self.moves)
+        return pokemon
+
+    def __str__(self) -> str:
+        moves = f" ({'/'.join(self.moves)})" if self.moves else ''
+        return f"{self.name} Lv.{self.level}{moves}"
+
+
+# 1つの組み合わせの集計。別のシャードの結果と足し合わせられる
+@dataclass
+class MatchupResult:
+    wins: int = 0
+    losses: int = 0
+    draws: int = 0
+    turns: int = 0
+
+    @property
+    def battles(self) -> int:
+        return self.wins + self.losses + self.draws
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.battles if self.battles else 0.0
+
+    def merge(self, other: 'MatchupResult') -> None:
+        self.wins += other.wins
+        self.losses += other.losses
+        self.draws += other.draws
+        self.turns += other.turns
+
+
+@dataclass
+class SimulationResult:
+    matchups: Dict[Tuple[Combatant, Combatant], MatchupResult] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def battles(self) -> int:
+        return sum(result.battles for result in self.matchups.values())
+
+    @property
+    def battles_per_second(self) -> float:
+        return self.battles / self.elapsed if self.elapsed else 0.0
+
+    def merge(self, other: 'SimulationResult') -> None:
+        for key, result in other.matchups.items():
+            self.matchups.setdefault(key, MatchupResult()).merge(result)
+
+
+def _plan(calculator: DamageCalculator, attacker: Pokemon, defender: Pokemon):
+    # 能力変化がないので、期待ダメージが最大のわざを使い続ける
+    best = None
+    best_value = 0
+    for move in attacker.moves:
+        value = calculator.damage(attacker, defender, move) * (100 if move.accuracy is None else move.accuracy)
+        if value > best_value:
+            best, best_value = move, value
+    if best is None:
+        return None
+    return [calculator.damage(attacker, defender, best, roll) for roll in ROLLS], best.accuracy
+
+
+def battle(a: Pokemon, b: Pokemon, rng: random.Random, calculator: DamageCalculator = None,
+           max_turns: int = MAX_TURNS) -> Tuple[Optional[int], int]:
+    """勝った側 (0: a, 1: b, None: 引き分け) と経過ターン数を返す"""
+    calculator = calculator or DamageCalculator()
+    plans = (_plan(calculator, a, b), _plan(calculator, b, a))
+    if plans == (None, None):
+        return None, 0
+    hp = [a._stats[HP], b._stats[HP]]
+    speeds = (a._stats[SPEED], b._stats[SPEED])
+    for turn in range(1, max_turns + 1):
+        if speeds[0] != speeds[1]:
+            first = 0 if speeds[0] > speeds[1] else 1
+        else:
+            first = rng.randrange(2)
+        for attacker in (first, 1 - first):
+            plan = plans[attacker]
+            if plan is None:
+                continue
+            damages, accuracy = plan
+            if accuracy is None or rng.randrange(100) < accuracy:
+                hp[1 - attacker] -= damages[rng.randrange(len(damages))]
+                if hp[1 - attacker] <= 0:
+                    return attacker, turn
+    return None, max_turns
+
+
+def _run_shard(a: Combatant, b: Combatant, battles: int, seed: str) -> SimulationResult:
+    rng = random.Random(seed)
+    calculator = DamageCalculator()
+    result = MatchupResult()
+    for _ in range(battles):
+        winner, turns = battle(a.create(rng), b.create(rng), rng, calculator)
+        if winner == 0:
+            result.wins += 1
+        elif winner == 1:
+            result.losses += 1
+        else:
+            result.draws += 1
+        result.turns += turns
+    return SimulationResult({(a, b): result})
+
+
+def simulate(matchups: Sequence[Tuple[Combatant, Combatant]], battles: int, seed: int = 0,
+             workers: int = 1) -> SimulationResult:
+    # シャードの分け方と乱数の種はワーカー数に依存しないので、結果は常に同じになる
+    tasks = []
+    for i, (a, b) in enumerate(matchups):
+        for start in range(0, battles, SHARD_SIZE):
+            tasks.append((a, b, min(SHARD_SIZE, battles - start), f"{seed}:{i}:{start}"))
+
+    total = SimulationResult()
+    start_time = time.perf_counter()
+    if workers <= 1:
+        shards = [_run_shard(*task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            shards = list(executor.map(_run_shard, *zip(*tasks), chunksize=1))
+    for shard in shards:
+        total.merge(shard)
+    total.elapsed = time.perf_counter() - start_time
+    return total
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='1対1バトルの勝率シミュレーター')
+    parser.add_argument('combatants', nargs='+', help='ポケモン名:レベル[:わざ1/わざ2/...]')
+    parser.add_argument('--battles', type=int, default=10000, help='組み合わせごとのバトル数')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    combatants = [Combatant.parse(text) for text in args.combatants]
+    if len(combatants) < 2:
+        parser.error('対戦相手を2体以上指定してください。')
+    result = simulate(list(combinations(combatants, 2)), args.battles, args.seed, args.workers)
+
+    for (a, b), matchup in result.matchups.items():
+        print(f"{a} vs {b}: 勝率 {matchup.win_rate:.1%} "
+              f"({matchup.wins}勝 {matchup.losses}敗 {matchup.draws}分, "
+              f"平均 {matchup.turns / matchup.battles:.1f} ターン)")
+    print(f"{result.battles} バトル / {result.elapsed:.2f} 秒 ({result.battles_per_second:,.0f} バトル/秒)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from typing import ClassVar, Dict, Iterable, Mapping, Tuple
+from .config import Config
+from .exp_strategy import ExpStrategy, get_exp_strategy
+from .learnset import Learnset, LearnsetIndex
+from .stats import frozen_stat_array
+
+# 種族ごとに一度だけ作り、すべての個体で参照を共有する
+@dataclass(frozen=True, eq=False)
+class Species:
+    name: str
+    types: Tuple[str, ...]
+    # 全個体で共有するので読み取り専用
+    base_stats: memoryview
+    learnset: Learnset
+    exp_strategy: ExpStrategy
+
+    _cache: ClassVar[Dict[str, 'Species']] = {}
+    # 種族データが入れ替わるたびに増える。個体はこれを見て種族値などを参照し直す
+    generation: ClassVar[int] = 0
+
+    @classmethod
+    def get(cls, name: str) -> 'Species':
+        species = cls._cache.get(name)
+        if species is None:
+            # データの入れ替え (DataReloader.reload) も Config._lock を持って行うので、
+            # 古いデータから作った種族が入れ替え後のキャッシュに残ることはない
+            with Config._lock:
+                species = cls._cache.get(name)
+                if species is None:
+                    if name not in Config.POKEMON_DATA:
+                        raise ValueError(f"{name} というポケモンはデータベースにありません。")
+                    species = cls._cache[name] = cls.from_data(name, Config.POKEMON_DATA[name])
+        return species
+
+    @classmethod
+    def from_data(cls, name: str, data: Mapping) -> 'Species':
+        types = data['type']
+        return cls(
+            name=name,
+            types=tuple(types) if isinstance(types, (list, tuple)) else (types,),
+            base_stats=frozen_stat_array(data['base_stats']),
+            learnset=Learnset(data['level_up_moves']),
+            exp_strategy=get_exp_strategy(data['exp_growth'])
+        )
+
+    @property
+    def level_up_moves(self) -> Mapping[int, Tuple[str, ...]]:
+        return self.learnset.level_up_moves
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._cache.clear()
+        cls.generation += 1
+        # 逆引き索引も種族の Learnset を参照しているので作り直す
+        LearnsetIndex.clear_cache()
+
+    @classmethod
+    def invalidate(cls, names: Iterable[str]) -> None:
+        # 変更された種族だけを作り直す
+        for name in names:
+            cls._cache.pop(name, None)
+        cls.generation += 1
+        LearnsetIndex.clear_cache()
@@ -0,0 +1,126 @@
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator, Mapping, MutableMapping, Optional, Union
+
+# ステータスの並び順 (配列のインデックスと対応)
+STAT_KEYS = ('hp', 'attack', 'defense', 'sp_attack', 'sp_defense', 'speed')
+STAT_INDEX = {stat: i for i, stat in enumerate(STAT_KEYS)}
+HP = STAT_INDEX['hp']
+# 個体ごとの配列 (array) か、種族で共有する読み取り専用の配列 (memoryview)
+StatValues = Union[array, memoryview]
+
+STAT_NAMES = {
+    'hp': 'HP', 'attack': 'こうげき', 'defense': 'ぼうぎょ',
+    'sp_attack': 'とくこう', 'sp_defense': 'とくぼう', 'speed': 'すばやさ'
+}
+
+def stat_array(values: Mapping[str, int] = None) -> array:
+    if values is None:
+        return array('H', bytes(2 * len(STAT_KEYS)))
+    return array('H', [values[stat] for stat in STAT_KEYS])
+
+def frozen_stat_array(values: Mapping[str, int]) -> memoryview:
+    # 種族値のように共有する値は読み取り専用にする (添字・len()・tobytes() は array と同じように使える)
+    return memoryview(stat_array(values)).toreadonly()
+
+class StatView(MutableMapping):
+    """6要素の配列を dict と同じように扱うためのビュー"""
+    __slots__ = ('_values', '_owner', '_field')
+
+    def __init__(self, values: StatValues, owner: Any = None, field: Optional[str] = None):
+        self._values = values
+        # 書き換えられたら owner のステータスを再計算が必要な状態にする
+        self._owner = owner
+        # owner の属性名。書き換えるときは owner._replace_stat() で配列ごと差し替える (コピーオンライト)
+        self._field = field
+
+    def __getitem__(self, stat: str) -> int:
+        return self._values[STAT_INDEX[stat]]
+
+    def __setitem__(self, stat: str, value: int) -> None:
+        if self._field is not None:
+            self._values = self._owner._replace_stat(self._field, STAT_INDEX[stat], value)
+            return
+        self._values[STAT_INDEX[stat]] = value
+        if self._owner is not None:
+            self._owner._stats_dirty = True
+
+    def __delitem__(self, stat: str) -> None:
+        raise TypeError("ステータスは削除できません。")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(STAT_KEYS)
+
+    def __len__(self) -> int:
+        return len(STAT_KEYS)
+
+    def copy(self) -> dict:
+        return dict(zip(STAT_KEYS, self._values))
+
+    def __repr__(self) -> str:
+        return repr(self.copy())
+
+
+# 計算済みステータスの LRU キャッシュ。
+# キーは (種族値, レベル, 個体値, 努力値, 性格)、値はステータス配列のバイト列。
+# スレッドどうしが1つのロックを奪い合わないよう、キーのハッシュで分けた区画ごとにロックと LRU を持つ
+class _CacheShard:
+    __slots__ = ('entries', 'lock', 'hits', 'misses', 'evictions')
+
+    def __init__(self):
+        self.entries: 'OrderedDict[Hashable, bytes]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+class StatCache:
+    def __init__(self, maxsize: int = 65536, shards: int = 16):
+        # maxsize は全区画の合計 (区画ごとの上限は均等に割り振る)
+        self.maxsize = maxsize
+        self._shards = tuple(_CacheShard() for _ in range(max(1, shards)))
+
+    def _shard(self, key: Hashable) -> _CacheShard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        shard = self._shard(key)
+        with shard.lock:
+            value = shard.entries.get(key)
+            if value is None:
+                shard.misses += 1
+            else:
+                shard.hits += 1
+                shard.entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: bytes) -> None:
+        if self.maxsize <= 0:
+            return
+        limit = -(-self.maxsize // len(self._shards))
+        shard = self._shard(key)
+        with shard.lock:
+            shard.entries[key] = value
+            shard.entries.move_to_end(key)
+            while len(shard.entries) > limit:
+                shard.entries.popitem(last=False)
+                shard.evictions += 1
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.hits = shard.misses = shard.evictions = 0
+
+    def info(self) -> Dict[str, int]:
+        return {'hits': sum(shard.hits for shard in self._shards),
+                'misses': sum(shard.misses for shard in self._shards),
+                'evictions': sum(shard.evictions for shard in self._shards),
+                'size': sum(len(shard.entries) for shard in self._shards), 'maxsize': self.maxsize}
+
+
+STAT_CACHE = StatCache(int(os.environ.get('POKEMON_STAT_CACHE_SIZE', 65536)),
+                       int(os.environ.get('POKEMON_STAT_CACHE_SHARDS', 16)))
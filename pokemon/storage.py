@@ -0,0 +1,156 @@
+"""ボックスのポケモンを SQLite に保存し、種族・レベル・性格・個体値で検索する
+
+    with PokemonStore('box.sqlite3') as store:
+        store.add_many(roster)
+        for row in store.query('ピカチュウ', min_level=31, min_ivs={'speed': 31}):
+            pokemon = row.to_pokemon()
+
+検索結果は軽量な PokemonRow で返し、Pokemon が必要になったときだけ復元する。
+"""
+import sqlite3
+from itertools import islice
+from typing import Iterable, Iterator, Mapping, NamedTuple, Optional, Tuple
+from .nature import NatureTable
+from .pokemon import Pokemon
+from .stats import STAT_KEYS
+
+MAX_MOVES = 4
+# executemany 1回あたりの件数
+INSERT_BATCH = 10000
+
+IV_COLUMNS = tuple(f"iv_{stat}" for stat in STAT_KEYS)
+EV_COLUMNS = tuple(f"ev_{stat}" for stat in STAT_KEYS)
+MOVE_COLUMNS = tuple(f"move{i}" for i in range(1, MAX_MOVES + 1))
+PP_COLUMNS = tuple(f"pp{i}" for i in range(1, MAX_MOVES + 1))
+COLUMNS = ('species', 'level', 'exp', 'nature') + IV_COLUMNS + EV_COLUMNS + MOVE_COLUMNS + PP_COLUMNS
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS pokemon (
+    id INTEGER PRIMARY KEY,
+    species TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    exp INTEGER NOT NULL,
+    nature TEXT NOT NULL,
+    {', '.join(f'{column} INTEGER NOT NULL' for column in IV_COLUMNS + EV_COLUMNS)},
+    {', '.join(f'{column} TEXT' for column in MOVE_COLUMNS)},
+    {', '.join(f'{column} INTEGER' for column in PP_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS pokemon_species_level ON pokemon (species, level);
+CREATE INDEX IF NOT EXISTS pokemon_level ON pokemon (level);
+CREATE INDEX IF NOT EXISTS pokemon_nature ON pokemon (nature);
+"""
+
+INSERT = f"INSERT INTO pokemon ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+SELECT = f"SELECT id, {', '.join(COLUMNS)} FROM pokemon"
+
+
+class PokemonRow(NamedTuple):
+    id: int
+    name: str
+    level: int
+    exp: int
+    nature: str
+    ivs: Tuple[int, ...]
+    evs: Tuple[int, ...]
+    moves: Tuple[Tuple[str, int], ...]
+
+    @classmethod
+    def from_row(cls, row: tuple) -> 'PokemonRow':
+        ivs = row[5:11]
+        evs = row[11:17]
+        moves = tuple((name, pp) for name, pp in zip(row[17:21], row[21:25]) if name is not None)
+        return cls(row[0], row[1], row[2], row[3], row[4], ivs, evs, moves)
+
+    def to_pokemon(self) -> Pokemon:
+        return Pokemon.restore(self.name, self.level, self.exp, NatureTable.id_of(self.nature),
+                               self.ivs, self.evs, self.moves)
+
+
+def _to_row(pokemon: Pokemon) -> tuple:
+    # 一度だけ取り出して、わざと PP を同じ時点の内容から読む
+    moves = list(pokemon.moves)
+    names = [move.name for move in moves]
+    pps = [move.pp for move in moves]
+    padding = [None] * (MAX_MOVES - len(names))
+    return (pokemon.name, pokemon.level, pokemon.exp, pokemon.nature.name,
+            *pokemon._ivs, *pokemon._evs, *names, *padding, *pps, *padding)
+
+
+class PokemonStore:
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> 'PokemonStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add(self, pokemon: Pokemon) -> int:
+        with self._connection:
+            return self._connection.execute(INSERT, _to_row(pokemon)).lastrowid
+
+    def add_many(self, roster: Iterable[Pokemon]) -> int:
+        """roster を1つのトランザクションでまとめて保存し、保存した件数を返す"""
+        rows = map(_to_row, roster)
+        count = 0
+        with self._connection:
+            while True:
+                batch = list(islice(rows, INSERT_BATCH))
+                if not batch:
+                    return count
+                self._connection.executemany(INSERT, batch)
+                count += len(batch)
+
+    def get(self, id: int) -> Optional[PokemonRow]:
+        row = self._connection.execute(f"{SELECT} WHERE id = ?", (id,)).fetchone()
+        return None if row is None else PokemonRow.from_row(row)
+
+    @staticmethod
+    def _where(species: Optional[str], min_level: Optional[int], max_level: Optional[int],
+               nature: Optional[str], min_ivs: Optional[Mapping[str, int]]) -> Tuple[str, list]:
+        conditions = []
+        params = []
+        if species is not None:
+            conditions.append('species = ?')
+            params.append(species)
+        if min_level is not None:
+            conditions.append('level >= ?')
+            params.append(min_level)
+        if max_level is not None:
+            conditions.append('level <= ?')
+            params.append(max_level)
+        if nature is not None:
+            conditions.append('nature = ?')
+            params.append(nature)
+        for stat, value in (min_ivs or {}).items():
+            if stat not in STAT_KEYS:
+                raise ValueError(f"{stat} というステータスはありません。")
+            conditions.append(f'iv_{stat} >= ?')
+            params.append(value)
+        return (' WHERE ' + ' AND '.join(conditions) if conditions else ''), params
+
+    def query(self, species: Optional[str] = None, min_level: Optional[int] = None,
+              max_level: Optional[int] = None, nature: Optional[str] = None,
+              min_ivs: Optional[Mapping[str, int]] = None) -> Iterator[PokemonRow]:
+        where, params = self._where(species, min_level, max_level, nature, min_ivs)
+        for row in self._connection.execute(f"{SELECT}{where} ORDER BY id", params):
+            yield PokemonRow.from_row(row)
+
+    def query_pokemon(self, *args, **kwargs) -> Iterator[Pokemon]:
+        for row in self.query(*args, **kwargs):
+            yield row.to_pokemon()
+
+    def count(self, species: Optional[str] = None, min_level: Optional[int] = None,
+              max_level: Optional[int] = None, nature: Optional[str] = None,
+              min_ivs: Optional[Mapping[str, int]] = None) -> int:
+        where, params = self._where(species, min_level, max_level, nature, min_ivs)
+        return self._connection.execute(f"SELECT COUNT(*) FROM pokemon{where}", params).fetchone()[0]
+
+    def __len__(self) -> int:
+        return self.count()
@@ -0,0 +1,241 @@
+"""種族・わざデータをメモリマップして読むための固定長レコード形式
+
+ファイル構成:
+    ヘッダ | 種族レコード | わざレコード | 覚えるわざレコード | 種族名索引 | わざ名索引 | 文字列テーブル
+
+文字列はすべて文字列テーブル内の (オフセット, バイト長) で参照する。
+名前索引は UTF-8 のバイト順に並べた ID の配列で、二分探索で引く。
+
+YAML からの変換:
+    python -m pokemon.store [データディレクトリ] [出力ファイル]
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+from .stats import STAT_KEYS
+
+MAGIC = b'PKST'
+VERSION = 1
+NONE = 0xFFFF
+
+HEADER = struct.Struct('<4sHHIIIIIIIII')
+# 名前, タイプ1, タイプ2, 種族値x6, 経験値成長率, 覚えるわざ (開始位置, 件数)
+SPECIES = struct.Struct('<IHIHIH6HIHIH')
+# 名前, タイプ, 威力, 命中, PP, 分類
+MOVE = struct.Struct('<IHIHHHHIH')
+# レベル, わざ名
+LEARNSET = struct.Struct('<HIH')
+
+
+class _StringTable:
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets: Dict[str, Tuple[int, int]] = {}
+
+    def add(self, text: Optional[str]) -> Tuple[int, int]:
+        if text is None:
+            return 0, 0
+        if text not in self.offsets:
+            encoded = text.encode('utf-8')
+            self.offsets[text] = (len(self.data), len(encoded))
+            self.data += encoded
+        return self.offsets[text]
+
+
+def _optional(value: Optional[int]) -> int:
+    return NONE if value is None else value
+
+
+def _name_index(names: List[str]) -> bytes:
+    order = sorted(range(len(names)), key=lambda i: names[i].encode('utf-8'))
+    return array('I', order).tobytes()
+
+
+def build_store(pokemon_data: Mapping, moves_data: Mapping, out_path: str) -> None:
+    strings = _StringTable()
+
+    species_names = list(pokemon_data)
+    species_records = bytearray()
+    learnset_records = bytearray()
+    learnset_count = 0
+    for name in species_names:
+        data = pokemon_data[name]
+        types = list(data['type']) if isinstance(data['type'], (list, tuple)) else [data['type']]
+        if not 1 <= len(types) <= 2:
+            raise ValueError(f"{name} のタイプは1つか2つにしてください。")
+        start = learnset_count
+        for level, moves in sorted(data['level_up_moves'].items()):
+            for move in moves:
+                learnset_records += LEARNSET.pack(level, *strings.add(move))
+                learnset_count += 1
+        species_records += SPECIES.pack(
+            *strings.add(name), *strings.add(types[0]),
+            *strings.add(types[1] if len(types) > 1 else None),
+            *(data['base_stats'][stat] for stat in STAT_KEYS),
+            *strings.add(str(data['exp_growth'])),
+            start, learnset_count - start)
+
+    move_names = list(moves_data)
+    move_records = bytearray()
+    for name in move_names:
+        data = moves_data[name]
+        move_records += MOVE.pack(
+            *strings.add(name), *strings.add(data['type']),
+            _optional(data['power']), _optional(data['accuracy']), data['pp'],
+            *strings.add(data['category']))
+
+    sections = [species_records, move_records, learnset_records,
+                _name_index(species_names), _name_index(move_names), strings.data]
+    offsets = []
+    position = HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, 0, len(species_names), len(move_names),
+                               learnset_count, *offsets))
+        for section in sections:
+            file.write(section)
+    os.replace(tmp_path, out_path)
+
+
+class GameDataStore:
+    def __init__(self, path: str):
+        with open(path, 'rb') as file:
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, self.species_count, self.move_count, _,
+         self._species_off, self._moves_off, self._learnset_off,
+         self._species_index_off, self._moves_index_off, self._strings_off) = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} はデータストアの形式ではありません。")
+        self._species_ids: Dict[str, int] = {}
+        self._move_ids: Dict[str, int] = {}
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_off + offset
+        return self._mm[start:start + length].decode('utf-8')
+
+    def _find(self, name: str, index_off: int, count: int, record_off: int,
+              record_size: int, memo: Dict[str, int]) -> int:
+        found = memo.get(name)
+        if found is not None:
+            return found
+        key = name.encode('utf-8')
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record_id = struct.unpack_from('<I', self._mm, index_off + 4 * mid)[0]
+            offset, length = struct.unpack_from('<IH', self._mm, record_off + record_size * record_id)
+            start = self._strings_off + offset
+            candidate = self._mm[start:start + length]
+            if candidate < key:
+                lo = mid + 1
+            elif candidate > key:
+                hi = mid
+            else:
+                memo[name] = record_id
+                return record_id
+        raise KeyError(name)
+
+    def species_id(self, name: str) -> int:
+        return self._find(name, self._species_index_off, self.species_count,
+                          self._species_off, SPECIES.size, self._species_ids)
+
+    def move_id(self, name: str) -> int:
+        return self._find(name, self._moves_index_off, self.move_count,
+                          self._moves_off, MOVE.size, self._move_ids)
+
+    def species_name(self, species_id: int) -> str:
+        return self._string(*struct.unpack_from('<IH', self._mm, self._species_off + SPECIES.size * species_id))
+
+    def move_name(self, move_id: int) -> str:
+        return self._string(*struct.unpack_from('<IH', self._mm, self._moves_off + MOVE.size * move_id))
+
+    def species(self, species_id: int) -> Dict:
+        if not 0 <= species_id < self.species_count:
+            raise IndexError(species_id)
+        record = SPECIES.unpack_from(self._mm, self._species_off + SPECIES.size * species_id)
+        types = [self._string(*record[2:4])]
+        if record[5]:
+            types.append(self._string(*record[4:6]))
+        level_up_moves: Dict[int, List[str]] = {}
+        start, count = record[14:16]
+        for i in range(start, start + count):
+            level, offset, length = LEARNSET.unpack_from(self._mm, self._learnset_off + LEARNSET.size * i)
+            level_up_moves.setdefault(level, []).append(self._string(offset, length))
+        return {
+            'type': types[0] if len(types) == 1 else types,
+            'base_stats': dict(zip(STAT_KEYS, record[6:12])),
+            'level_up_moves': level_up_moves,
+            'exp_growth': self._string(*record[12:14]),
+        }
+
+    def move(self, move_id: int) -> Dict:
+        if not 0 <= move_id < self.move_count:
+            raise IndexError(move_id)
+        record = MOVE.unpack_from(self._mm, self._moves_off + MOVE.size * move_id)
+        return {
+            'type': self._string(*record[2:4]),
+            'power': None if record[4] == NONE else record[4],
+            'accuracy': None if record[5] == NONE else record[5],
+            'pp': record[6],
+            'category': self._string(*record[7:9]),
+        }
+
+    @property
+    def pokemon_data(self) -> '_StoreMapping':
+        return _StoreMapping(self.species_id, self.species, self.species_name, self.species_count)
+
+    @property
+    def moves_data(self) -> '_StoreMapping':
+        return _StoreMapping(self.move_id, self.move, self.move_name, self.move_count)
+
+
+# Config.POKEMON_DATA / MOVES_DATA の代わりに使える、名前で引くビュー
+class _StoreMapping(Mapping):
+    def __init__(self, find, record, name, count):
+        self._find = find
+        self._record = record
+        self._name = name
+        self._count = count
+
+    def __getitem__(self, name: str) -> Dict:
+        return self._record(self._find(name))
+
+    def __contains__(self, name) -> bool:
+        try:
+            self._find(name)
+        except (KeyError, AttributeError):
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._name(i) for i in range(self._count))
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def main(argv: List[str]) -> None:
+    from .config import Config
+    from .data_loader import DataLoader
+
+    data_dir = argv[0] if argv else Config.DATA_DIR
+    out_path = argv[1] if len(argv) > 1 else os.path.join(data_dir, 'game_data.pkst')
+    build_store(DataLoader.load_data(os.path.join(data_dir, 'pokemon_data.yml')),
+                DataLoader.load_data(os.path.join(data_dir, 'moves_data.yml')),
+                out_path)
+    print(f"{out_path} を作成しました。")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
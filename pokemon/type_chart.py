@@ -0,0 +1,56 @@
+from typing import ClassVar, Dict, List, Mapping, Optional, Sequence, Tuple
+from .config import Config
+
+# タイプ相性表。タイプ名は読み込み時に小さな整数 ID に置き換え、
+# 倍率は 2 倍した整数 (0, 1, 2, 4) の密な行列で持つ
+class TypeChart:
+    SCALE = 2
+
+    _default: ClassVar[Optional['TypeChart']] = None
+
+    def __init__(self, chart: Mapping[str, Mapping[str, float]]):
+        names: List[str] = list(chart)
+        for row in chart.values():
+            names.extend(name for name in row if name not in names)
+        self.type_names: Tuple[str, ...] = tuple(names)
+        self.type_ids: Dict[str, int] = {name: i for i, name in enumerate(names)}
+        # 最後の列は「タイプなし」(単タイプの2つ目) で、常に等倍
+        self.none_id = len(names)
+        self.matrix: List[List[int]] = [[self.SCALE] * (len(names) + 1) for _ in names]
+        for attacking, row in chart.items():
+            for defending, multiplier in row.items():
+                self.matrix[self.type_ids[attacking]][self.type_ids[defending]] = int(multiplier * self.SCALE)
+
+    @classmethod
+    def default(cls) -> 'TypeChart':
+        if cls._default is None:
+            cls._default = cls(Config.TYPE_CHART)
+        return cls._default
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._default = None
+
+    def type_id(self, name: str) -> int:
+        try:
+            return self.type_ids[name]
+        except KeyError:
+            raise ValueError(f"{name} というタイプはタイプ相性表にありません。") from None
+
+    def defender_ids(self, types: Sequence[str]) -> Tuple[int, int]:
+        if not 1 <= len(types) <= 2:
+            raise ValueError("タイプは1つか2つにしてください。")
+        return self.type_id(types[0]), self.type_id(types[1]) if len(types) > 1 else self.none_id
+
+    def effectiveness(self, move_type: str, defender_types: Sequence[str]) -> int:
+        # SCALE**2 (=4) 倍した相性。4 で等倍
+        row = self.matrix[self.type_id(move_type)]
+        first, second = self.defender_ids(defender_types)
+        return row[first] * row[second]
+
+    def multiplier(self, move_type: str, defender_types: Sequence[str]) -> float:
+        return self.effectiveness(move_type, defender_types) / self.SCALE ** 2
+
+    def as_array(self):
+        import numpy as np
+        return np.asarray(self.matrix, dtype=np.int64)
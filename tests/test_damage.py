@@ -0,0 +1,86 @@
+"""damage_many / DamageTable の結果が、1件ずつ計算する DamageCalculator.damage と一致することを確かめる
+
+    python -m unittest tests.test_damage
+"""
+import random
+import unittest
+from itertools import product
+from pokemon.config import Config
+from pokemon.damage import MAX_ROLL, MIN_ROLL, DamageCalculator, DamageTable, calculate_damage, damage_batch
+from pokemon.move import MoveSpec
+from pokemon.pokemon import Pokemon
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "numpy がないので NumPy 版は使えません。")
+class DamageManyTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.roster = [Pokemon.create_pokemon(name, level, rng=rng)
+                       for name in Config.POKEMON_DATA for level in (5, 8)]
+        # 覚えていないわざも含め、同梱のすべてのわざ (変化技・威力なしも含む) で確かめる
+        self.specs = [MoveSpec.get(name) for name in Config.MOVES_DATA]
+        self.calculator = DamageCalculator()
+        combinations = list(product(self.roster, self.roster, self.specs))
+        self.attackers, self.defenders, self.moves = (list(column) for column in zip(*combinations))
+        self.rolls = [rng.randint(MIN_ROLL, MAX_ROLL) for _ in combinations]
+
+    def expected(self, attackers, defenders, moves, rolls):
+        return [self.calculator.damage(a, d, m, r) for a, d, m, r in zip(attackers, defenders, moves, rolls)]
+
+    def test_few_combinations(self):
+        # VECTORIZE_MIN より少なければ1件ずつ計算する
+        columns = (self.attackers, self.defenders, self.moves, self.rolls)
+        self.assertLess(len(self.moves), DamageCalculator.VECTORIZE_MIN)
+        self.assertEqual(self.calculator.damage_many(*columns).tolist(), self.expected(*columns))
+
+    def test_distinct_pokemon(self):
+        # 同じ個体がほとんど繰り返されなければ、表を作らずに1件ずつ計算する
+        rng = random.Random(1)
+        count = DamageCalculator.VECTORIZE_MIN
+        names = list(Config.POKEMON_DATA)
+        roster = Pokemon.create_many([(rng.choice(names), rng.randint(1, 8)) for _ in range(2 * count)], seed=1)
+        columns = (roster[:count], roster[count:], [rng.choice(self.specs) for _ in range(count)],
+                   [rng.randint(MIN_ROLL, MAX_ROLL) for _ in range(count)])
+        self.assertFalse(DamageCalculator._repeats_enough(columns[0], columns[1]))
+        self.assertEqual(self.calculator.damage_many(*columns).tolist(), self.expected(*columns))
+
+    def test_repeated_pokemon(self):
+        # 同じ個体が何度も現れれば、表を作ってまとめて計算する
+        repeat = DamageCalculator.VECTORIZE_MIN // len(self.moves) + 1
+        columns = (self.attackers * repeat, self.defenders * repeat, self.moves * repeat, self.rolls * repeat)
+        self.assertTrue(DamageCalculator._repeats_enough(columns[0], columns[1]))
+        self.assertEqual(self.calculator.damage_many(*columns).tolist(), self.expected(*columns))
+
+    def test_move_slots_match_specs(self):
+        attackers = [pokemon for pokemon in self.roster for _ in pokemon.moves]
+        slots = [slot for pokemon in self.roster for slot in pokemon.moves]
+        defenders = [self.roster[0]] * len(slots)
+        self.assertEqual(self.calculator.damage_many(attackers, defenders, slots).tolist(),
+                         self.expected(attackers, defenders, slots, [MAX_ROLL] * len(slots)))
+
+    def test_damage_table(self):
+        table = DamageTable(self.roster, self.specs)
+        pokemon_ids = {id(pokemon): i for i, pokemon in enumerate(self.roster)}
+        move_ids = {spec: i for i, spec in enumerate(self.specs)}
+        expected = self.expected(self.attackers, self.defenders, self.moves, self.rolls)
+        indexed = table.damage([pokemon_ids[id(a)] for a in self.attackers],
+                               [pokemon_ids[id(d)] for d in self.defenders],
+                               [move_ids[m] for m in self.moves], self.rolls)
+        self.assertEqual(indexed.tolist(), expected)
+        reused = self.calculator.damage_many(self.attackers, self.defenders, self.moves, self.rolls, table=table)
+        self.assertEqual(reused.tolist(), expected)
+
+    def test_damage_batch_matches_calculate_damage(self):
+        cases = list(product((1, 50, 100), (0, 40, 120), (5, 200), (5, 200), (False, True), (0, 1, 2, 4, 8, 16),
+                             (MIN_ROLL, MAX_ROLL)))
+        expected = [calculate_damage(*case) for case in cases]
+        self.assertEqual(damage_batch(*zip(*cases)).tolist(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""set_level / create_pokemon が、1レベルずつ上げていた従来の処理と同じ結果になることを確かめる
+
+    python -m unittest tests.test_set_level
+"""
+import random
+import unittest
+from pokemon.config import Config
+from pokemon.pokemon import Pokemon
+
+
+class BaselinePokemon:
+    """従来の Pokemon のうち、レベル・ステータス・わざを決める部分の写し (性格と個体値は外から渡す)"""
+
+    def __init__(self, name, nature, ivs, level=1):
+        data = Config.POKEMON_DATA[name]
+        self.nature = nature
+        self.base_stats = data['base_stats']
+        self.level = level
+        self.ivs = dict(ivs)
+        self.evs = {stat: 0 for stat in self.base_stats}
+        self.stats = {stat: 0 for stat in self.base_stats}
+        self.moves = []
+        self.level_up_moves = data['level_up_moves']
+
+        self.set_level(level)
+        self.calculate_stats()
+
+    def set_level(self, level):
+        while self.level < level:
+            self.level_up(initial_setup=True)
+        self.calculate_stats()
+        self.initialize_moves()
+
+    def calculate_stats(self):
+        for stat, base in self.base_stats.items():
+            if stat == 'hp':
+                self.stats[stat] = self._calculate_hp(base)
+            else:
+                self.stats[stat] = self._calculate_other_stat(stat, base)
+
+    def _calculate_hp(self, base):
+        return int((2 * base + self.ivs['hp'] + self.evs['hp'] // 4) * self.level / 100) + self.level + 10
+
+    def _calculate_other_stat(self, stat, base):
+        value = int(((2 * base + self.ivs[stat] + self.evs[stat] // 4) * self.level / 100) + 5)
+        return int(value * self.nature.get_multiplier(stat))
+
+    def _add_move(self, move_name):
+        move_data = Config.MOVES_DATA[move_name]
+        if len(self.moves) < 4:
+            self.moves.append((move_name, move_data['pp']))
+
+    def level_up(self, initial_setup=False):
+        self.level += 1
+        self._learn_new_moves(initial_setup)
+
+    def _learn_new_moves(self, initial_setup):
+        if self.level in self.level_up_moves:
+            for move in self.level_up_moves[self.level]:
+                self._add_move(move)
+
+    def initialize_moves(self):
+        all_moves = [move for level, moves in self.level_up_moves.items()
+                     for move in moves if level <= self.level]
+        final_moves = all_moves[-4:] if len(all_moves) >= 4 else all_moves
+        self.moves = []
+        for move in final_moves:
+            self._add_move(move)
+
+
+def playable_levels(name):
+    # 同梱のデータには載っていないわざもあるので、覚えるわざがすべてそろっているレベルまでを使う
+    levels = []
+    for level in range(1, 101):
+        if any(move not in Config.MOVES_DATA for move in Config.POKEMON_DATA[name]['level_up_moves'].get(level, ())):
+            break
+        levels.append(level)
+    return levels
+
+
+def result(pokemon):
+    return pokemon.level, dict(pokemon.stats), [(move.name, move.pp) for move in pokemon.moves]
+
+
+def baseline_result(pokemon):
+    return pokemon.level, pokemon.stats, pokemon.moves
+
+
+class SetLevelTest(unittest.TestCase):
+    def test_create_pokemon_matches_baseline(self):
+        for name in Config.POKEMON_DATA:
+            for level in playable_levels(name):
+                with self.subTest(name=name, level=level):
+                    pokemon = Pokemon.create_pokemon(name, level, rng=random.Random(level))
+                    expected = BaselinePokemon(name, pokemon.nature, pokemon.ivs, level)
+                    self.assertEqual(result(pokemon), baseline_result(expected))
+
+    def test_set_level_matches_level_by_level_loop(self):
+        for name in Config.POKEMON_DATA:
+            for level in playable_levels(name):
+                with self.subTest(name=name, level=level):
+                    pokemon = Pokemon.create_pokemon(name, 1, rng=random.Random(level))
+                    expected = BaselinePokemon(name, pokemon.nature, pokemon.ivs, 1)
+                    pokemon.set_level(level)
+                    expected.set_level(level)
+                    self.assertEqual(result(pokemon), baseline_result(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()